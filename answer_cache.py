@@ -0,0 +1,100 @@
+"""İki seviyeli cevap önbelleği (birebir + anlamsal eşleşme)"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from text_utils import normalize_query
+
+
+def history_digest(history):
+    """Modele giden konuşma geçmişinin kısa özeti (önbellek / single-flight anahtarı için)"""
+    if not history:
+        return ""
+    payload = json.dumps(history, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+class AnswerCache:
+    """Oturumlar arası paylaşılan, TTL + LRU tahliyeli cevap önbelleği.
+
+    1. seviye: normalize edilmiş soru + kategori ile birebir eşleşme.
+    2. seviye: aynı kategoride, embedding'i verilen kosinüs mesafesinin
+       altında kalan en yakın soru.
+
+    Her iki seviyede de konuşma geçmişinin özeti (history_digest) anahtarın
+    parçasıdır: "peki süresi ne kadar?" gibi devam soruları başka bir
+    konuşmada verilmiş cevabı almaz.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=6 * 3600, max_distance=0.08):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    @staticmethod
+    def _key(query, category, history_key=""):
+        return (normalize_query(query), category or "*", history_key)
+
+    @staticmethod
+    def _unit(embedding):
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _expired(self, entry, now):
+        return now - entry["created_at"] > self.ttl_seconds
+
+    def get(self, query, category, embedding=None, history_key=""):
+        """Önbellekteki cevabı döndür, yoksa None"""
+        key = self._key(query, category, history_key)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._expired(entry, now):
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return entry
+            if entry:
+                del self._entries[key]
+
+            if embedding is not None:
+                candidates = [
+                    (k, e) for k, e in self._entries.items()
+                    if k[1:] == key[1:] and e["embedding"] is not None and not self._expired(e, now)
+                ]
+                if candidates:
+                    matrix = np.stack([e["embedding"] for _, e in candidates])
+                    distances = 1.0 - matrix @ self._unit(embedding)
+                    best = int(np.argmin(distances))
+                    if distances[best] <= self.max_distance:
+                        best_key, best_entry = candidates[best]
+                        self._entries.move_to_end(best_key)
+                        self.stats["semantic_hits"] += 1
+                        return best_entry
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, query, category, answer, references, embedding=None, history_key=""):
+        """Cevabı önbelleğe yaz"""
+        key = self._key(query, category, history_key)
+        entry = {
+            "answer": answer,
+            "references": references,
+            "embedding": self._unit(embedding) if embedding is not None else None,
+            "created_at": time.time(),
+        }
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -1,10 +1,21 @@
 import streamlit as st
 import weaviate
-import weaviate.classes as wvc
 from openai import OpenAI
-from concurrent.futures import ThreadPoolExecutor
-import json
-import re
+import os
+import time
+from functools import partial
+
+from answer_cache import AnswerCache, history_digest
+from categories import COLLECTION_MAP
+from conversation import ConversationMemory
+from law_links import IncrementalLawExtractor
+from metrics import REGISTRY as metrics, start_http_server
+from pipeline import Pipeline, load_centroid_router
+from singleflight import SingleFlight
+from statute_index import StatuteIndex
+from streaming import RenderStats, ThrottledRenderer
+from tiering import DRAFT_RESET
+from text_utils import normalize_query
 
 # --- SAYFA AYARLARI ---
 st.set_page_config(page_title="Hukuk Asistanı", page_icon="⚖️", layout="wide")
@@ -129,22 +140,6 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- KATEGORİ TANIMLARI ---
-COLLECTION_MAP = {
-    "kira_hukuku": {
-        "collection": "HukukDoc",
-        "name": "Kira Hukuku",
-        "keywords": ["kira", "kiracı", "kiraya veren", "tahliye", "kira bedeli", "kiralama", "kira sözleşmesi", "kira artışı", "depozito", "ev sahibi"],
-        "emoji": "🏠"
-    },
-    "is_hukuku": {
-        "collection": "IsDavalari",
-        "name": "İş Hukuku",
-        "keywords": ["işçi", "işveren", "iş sözleşmesi", "işten çıkarma", "kıdem", "fazla mesai", "iş akdi", "çalışan", "istifa", "tazminat", "işe iade", "patron", "kovdu", "işsiz"],
-        "emoji": "💼"
-    }
-}
-
 # --- SIDEBAR ---
 with st.sidebar:
     st.image("https://img.icons8.com/ios-filled/100/ffffff/scales.png", width=80)
@@ -253,288 +248,355 @@ def get_weaviate_client():
 
 client = get_weaviate_client()
 
-# --- KANUN LİNKLERİ OTOMATİK TESPİT ---
-def extract_law_links(response_text):
-    """Cevaptaki kanun maddelerini tespit et ve link oluştur"""
-    
-    # Kanun veritabanı
-    law_database = {
-        "tbk": {
-            "patterns": [r"tbk", r"türk borçlar kanunu", r"borçlar kanunu", r"6098"],
-            "name": "Türk Borçlar Kanunu (TBK - 6098 Sayılı)",
-            "url": "https://www.mevzuat.gov.tr/mevzuat?MevzuatNo=6098&MevzuatTur=1&MevzuatTertip=5",
-            "pdf": "https://www.mevzuat.gov.tr/File/GeneratePdf?mevzuatNo=6098&mevzuatTur=KanunHukmu&mevzuatTertip=5"
-        },
-        "is_kanunu": {
-            "patterns": [r"iş kanunu", r"4857"],
-            "name": "İş Kanunu (4857 Sayılı)",
-            "url": "https://www.mevzuat.gov.tr/mevzuat?MevzuatNo=4857&MevzuatTur=1&MevzuatTertip=5",
-            "pdf": "https://www.mevzuat.gov.tr/File/GeneratePdf?mevzuatNo=4857&mevzuatTur=KanunHukmu&mevzuatTertip=5"
-        },
-        "medeni": {
-            "patterns": [r"medeni kanun", r"tmk", r"4721"],
-            "name": "Türk Medeni Kanunu (4721 Sayılı)",
-            "url": "https://www.mevzuat.gov.tr/mevzuat?MevzuatNo=4721&MevzuatTur=1&MevzuatTertip=5",
-            "pdf": "https://www.mevzuat.gov.tr/File/GeneratePdf?mevzuatNo=4721&mevzuatTur=KanunHukmu&mevzuatTertip=5"
-        },
-        "hmk": {
-            "patterns": [r"hmk", r"hukuk muhakemeleri", r"6100"],
-            "name": "Hukuk Muhakemeleri Kanunu (6100 Sayılı)",
-            "url": "https://www.mevzuat.gov.tr/mevzuat?MevzuatNo=6100&MevzuatTur=1&MevzuatTertip=5",
-            "pdf": "https://www.mevzuat.gov.tr/File/GeneratePdf?mevzuatNo=6100&mevzuatTur=KanunHukmu&mevzuatTertip=5"
-        },
-        "tck": {
-            "patterns": [r"tck", r"ceza kanunu", r"türk ceza kanunu", r"5237"],
-            "name": "Türk Ceza Kanunu (5237 Sayılı)",
-            "url": "https://www.mevzuat.gov.tr/mevzuat?MevzuatNo=5237&MevzuatTur=1&MevzuatTertip=5",
-            "pdf": "https://www.mevzuat.gov.tr/File/GeneratePdf?mevzuatNo=5237&mevzuatTur=KanunHukmu&mevzuatTertip=5"
-        }
-    }
-    
-    found_laws = []
-    text_lower = response_text.lower()
-    
-    # Her kanunu kontrol et
-    for law_key, law_info in law_database.items():
-        for pattern in law_info["patterns"]:
-            if re.search(pattern, text_lower):
-                if law_key not in [l["key"] for l in found_laws]:
-                    found_laws.append({
-                        "key": law_key,
-                        "name": law_info["name"],
-                        "url": law_info["url"],
-                        "pdf": law_info["pdf"]
-                    })
-                break
-    
-    return found_laws
+# --- SORU-CEVAP HATTI ---
+@st.cache_resource
+def get_pipeline():
+    """Routing, arama ve LLM hattı tüm oturumlar arasında paylaşılır"""
+    return Pipeline(client, ai_client, centroid_router=load_centroid_router())
+
+pipeline = get_pipeline()
+query_embedder = pipeline.query_embedder
+st.sidebar.caption(
+    f"🧮 Embedding: {query_embedder.stats['api_calls']} çağrı, "
+    f"{query_embedder.saved_calls} çağrı tasarruf"
+)
+
+# --- PERFORMANS METRİKLERİ ---
+# METRICS_PORT verilirse /metrics uç noktası açılır (Prometheus scrape),
+# METRICS_FILE verilirse her cevaptan sonra dosyaya yazılır (node_exporter textfile)
+METRICS_PORT = os.environ.get("METRICS_PORT")
+METRICS_FILE = os.environ.get("METRICS_FILE")
 
-# --- HIZLI KEYWORD ROUTİNG ---
-def classify_query_fast(query):
-    """Keyword tabanlı hızlı routing"""
-    query_lower = query.lower()
-    
-    scores = {}
-    for key, info in COLLECTION_MAP.items():
-        score = sum(1 for keyword in info["keywords"] if keyword in query_lower)
-        scores[key] = score
-    
-    # En yüksek skoru bul
-    if max(scores.values()) > 0:
-        return max(scores, key=scores.get)
-    
-    return None
-
-# --- PARALEL ARAMA ---
-def search_single_collection(collection_name, query, limit):
-    """Tek collection'da ara"""
-    try:
-        collection = client.collections.get(collection_name)
-        response = collection.query.hybrid(query=query, limit=limit, alpha=0.5)
-        return response.objects
-    except:
-        return []
-
-def search_parallel(query, category_keys):
-    """Paralel arama (daha hızlı)"""
-    results = []
-    
-    with ThreadPoolExecutor(max_workers=len(category_keys)) as executor:
-        futures = {}
-        
-        for key in category_keys:
-            info = COLLECTION_MAP[key]
-            future = executor.submit(
-                search_single_collection, 
-                info["collection"], 
-                query, 
-                4 if len(category_keys) == 1 else 2
+@st.cache_resource
+def start_metrics_server():
+    """Süreç başına tek HTTP sunucusu"""
+    return start_http_server(metrics, int(METRICS_PORT)) if METRICS_PORT else None
+
+start_metrics_server()
+
+# Panel sadece ?admin=<ADMIN_TOKEN> ile açılan oturumlarda görünür
+ADMIN_TOKEN = st.secrets.get("ADMIN_TOKEN")
+if ADMIN_TOKEN and st.query_params.get("admin") == ADMIN_TOKEN:
+    with st.sidebar.expander("📊 Performans"):
+        stage_rows = metrics.summary("hukuk_stage_seconds")
+        if stage_rows:
+            st.table([
+                {"aşama": row["stage"], "adet": row["count"],
+                 **{q: f"{row[q] * 1000:.0f} ms" for q in ("p50", "p95", "p99")}}
+                for row in stage_rows
+            ])
+        else:
+            st.caption("Henüz ölçüm yok.")
+        for row in metrics.summary("hukuk_llm_tokens_per_second"):
+            st.caption(f"LLM akış hızı p50: {row['p50']:.0f} parça/sn ({row['count']} cevap)")
+        for tier_name, totals in sorted(pipeline.tier_telemetry.totals.items()):
+            st.caption(
+                f"{tier_name} kademe: {totals['answers']} cevap, ${totals['cost_usd']:.3f}, "
+                f"ort. {totals['seconds'] / totals['answers']:.1f} sn"
             )
-            futures[future] = key
-        
-        for future in futures:
-            key = futures[future]
-            info = COLLECTION_MAP[key]
-            objects = future.result()
-            
-            for obj in objects:
-                results.append({
-                    "content": obj.properties['content'],
-                    "filename": obj.properties['filename'],
-                    "page": obj.properties['page_number'],
-                    "category": info["name"],
-                    "category_key": key,
-                    "emoji": info["emoji"]
-                })
-    
-    return results
+        for model, prompt_usage in sorted(pipeline.prompt_cache_snapshot().items()):
+            if prompt_usage["prompt_tokens"]:
+                st.caption(
+                    f"Prompt önbelleği ({model}): %{100 * prompt_usage['cached_tokens'] / prompt_usage['prompt_tokens']:.0f} "
+                    f"({prompt_usage['cached_tokens']}/{prompt_usage['prompt_tokens']} token)"
+                )
+
+# --- CEVAP ÖNBELLEĞİ ---
+ANSWER_CACHE_MAX_ENTRIES = 512
+ANSWER_CACHE_TTL_SECONDS = 6 * 3600
+ANSWER_CACHE_MAX_DISTANCE = 0.08  # Kosinüs mesafesi; küçüldükçe eşleşme katılaşır
 
-# --- TEK LLM ÇAĞRISI İLE ROUTİNG + CEVAP ---
-def get_answer_with_smart_routing(query, all_results, history):
-    """Tek LLM çağrısında hem kategori tespit hem cevap"""
-    
-    # Tüm kategorilerden context hazırla
-    contexts_by_category = {}
-    for result in all_results:
-        cat_key = result["category_key"]
-        if cat_key not in contexts_by_category:
-            contexts_by_category[cat_key] = []
-        contexts_by_category[cat_key].append(result)
-    
-    # Her kategoriden context oluştur
-    full_context = ""
-    for cat_key, results in contexts_by_category.items():
-        info = COLLECTION_MAP[cat_key]
-        full_context += f"\n\n=== {info['emoji']} {info['name'].upper()} KATEGORİSİ ===\n"
-        for r in results[:2]:  # Her kategoriden max 2 belge
-            full_context += f"[KAYNAK: {r['filename']} S.{r['page']}]\n{r['content'][:600]}...\n\n"
-    
-    # Sistem prompt'u (tek seferde hem routing hem cevap)
-    system_instruction = f"""Sen kıdemli bir hukuk müşavirisin. 
+@st.cache_resource
+def get_answer_cache():
+    """Tüm oturumlar arasında paylaşılan önbellek"""
+    return AnswerCache(
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+        max_distance=ANSWER_CACHE_MAX_DISTANCE
+    )
 
-GÖREVİN 2 AŞAMALI:
+answer_cache = get_answer_cache()
 
-1. ADIM - KATEGORİ TESPİTİ:
-Kullanıcının sorusunu analiz et ve hangi kategoriye ait olduğunu belirle.
-Mevcut kategoriler: {', '.join([f"{info['emoji']} {key}" for key, info in COLLECTION_MAP.items()])}
+# --- AYNI ANDAKİ AYNI SORULAR ---
+@st.cache_resource
+def get_single_flight():
+    """Aynı soru (normalize) + kategori aynı anda sorulursa arama ve LLM akışı paylaşılır"""
+    return SingleFlight()
+
+single_flight = get_single_flight()
+
+def answer_flight(prompt, categories_to_search, query_embedding, history, tier, flight):
+    """Paylaşılan iş: arama, context ve cevap akışı (oturumdan bağımsız thread'de)"""
+    all_results, search_failures = pipeline.search_parallel(prompt, categories_to_search, query_embedding)
+    context_results = pipeline.build_context(all_results)[0] if all_results else []
+    flight.set_result({
+        "all_results": all_results,
+        "search_failures": search_failures,
+        "context_results": context_results
+    })
+    if context_results:
+        for delta in pipeline.stream_answer(prompt, context_results, history, tier):
+            flight.emit(delta)
 
-2. ADIM - CEVAP OLUŞTURMA:
-Belirlediğin kategorideki belgelerden yararlanarak soruyu yanıtla.
+# --- STREAMING RENDER POLİTİKASI ---
+STREAM_FLUSH_INTERVAL = 0.1  # saniye; son yazmadan bu kadar geçince ekrana yaz
+STREAM_FLUSH_CHARS = 80  # ya da bu kadar karakter birikince
 
-KURALLAR:
-- Cevabın robotik olmasın, avukat gibi akıcı anlat
-- Önemli kısımları **kalın** yaz
-- Açıklama içinde kanun maddelerine atıfta bulun (örn: "TBK Madde 299'a göre...")
-- Belirlediğin kategoriyi cevabında belirtme (otomatik gösteriyoruz)
+@st.cache_resource
+def get_render_stats():
+    """Tüm oturumlar için render sayaçları"""
+    return RenderStats()
 
-ÇOK ÖNEMLİ FORMAT:
-Cevabını şu şekilde yapılandır:
+render_stats = get_render_stats()
+st.sidebar.caption(
+    f"🖋️ Cevap başına {render_stats.per_answer('renders'):.0f} render, "
+    f"{render_stats.per_answer('bytes_pushed') / 1024:.0f} KB, "
+    f"ilk kanun linki {render_stats.mean_first_link():.1f} sn"
+)
 
-[Ana açıklama burada - akıcı bir şekilde, kanun maddelerine atıflar yaparak]
+# --- KANUN MADDESİ ÖNİZLEMESİ ---
+ARTICLE_PREVIEW_CHARS = 600
 
-Örneğin: "Kiracı olarak **TBK Madde 299**'da belirtilen haklara sahipsiniz. Bu maddeye göre..."
+@st.cache_resource
+def get_statute_index():
+    """statute_index.py ile üretilmiş yerel madde indeksi (yoksa sadece linkler gösterilir)"""
+    return StatuteIndex.load()
 
----
+statute_index = get_statute_index()
 
-**📜 İlgili Kanun Maddeleri:**
-- [SADECE yukarıdaki açıklamada bahsettiğin maddeleri buraya tekrar listele]
-- [YENİ madde ekleme, sadece yukarıda kullandıklarını yaz]
-- [Her maddeyi ayrı satırda yaz, örn: "Türk Borçlar Kanunu Madde 299"]
-- [Eğer hiç kanun maddesi kullanmadıysan bu bölümü boş bırak]
+def render_law_links(law_links):
+    """Bahsedilen kanunları linkleriyle (ve indeks varsa madde metinleriyle) birlikte göster"""
+    with st.expander("🔗 Bahsedilen Kanunlar - Tam Metin", expanded=statute_index is not None):
+        st.markdown("**Yanıtta bahsedilen kanunların tam metinleri:**")
+        st.markdown("")
+        
+        for law in law_links:
+            st.markdown(f"📖 **{law['name']}**")
+            if law["articles"]:
+                st.markdown("Maddeler: " + ", ".join(f"[Madde {a['number']}]({a['url']})" for a in law["articles"]))
+            if statute_index is not None:
+                for a in law["articles"]:
+                    preview = statute_index.preview(law["key"], a["number"], ARTICLE_PREVIEW_CHARS)
+                    if preview:
+                        st.markdown("> " + preview.replace("\n", "  \n> "))
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown(f"[📄 Tam Metin Oku (mevzuat.gov.tr)]({law['url']})")
+            with col2:
+                st.markdown(f"[⬇️ PDF İndir]({law['pdf']})")
+            st.markdown("---")
+        
+        if statute_index is None:
+            st.info("💡 **İpucu:** Linke tıkladıktan sonra sayfada Ctrl+F (veya Cmd+F) yaparak bahsedilen madde numarasını arayabilirsiniz.")
 
-ÇOK ÖNEMLİ: Soruya en uygun kategorideki belgeleri kullan. Diğer kategorilerdeki belgeleri görmezden gel."""
+def replay_cached_answer(text, chunk_size=24):
+    """Önbellekteki cevabı stream gibi parça parça üret"""
+    for i in range(0, len(text), chunk_size):
+        yield text[i:i + chunk_size]
 
-    # Chat history
-    messages = [{"role": "system", "content": system_instruction}]
-    for m in history[-2:]:  # Son 2 mesaj
-        if m["role"] != "system":
-            messages.append({"role": m["role"], "content": m["content"]})
-    
-    messages.append({
-        "role": "user", 
-        "content": f"{full_context}\n\nSORU: {query}"
-    })
-    
-    # TEK LLM ÇAĞRISI
-    return ai_client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        temperature=0.4,
-        stream=True
-    )
+# --- KONUŞMA BELLEĞİ ---
+HISTORY_RECENT_MESSAGES = 4  # Olduğu gibi gönderilen son mesajlar
+HISTORY_SUMMARIZE_EVERY = 2  # Pencere dışına taşan bu kadar tur birikince özete katılır
+HISTORY_TOKEN_BUDGET = 800  # Özet + son mesajlar için modele giden en fazla token
+HISTORY_MAX_ARCHIVE_BYTES = 256 * 1024  # Oturum başına sıkıştırılmış eski mesaj sınırı
 
 # --- CHAT ARAYÜZÜ ---
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+if "conversation" not in st.session_state:
+    st.session_state.conversation = ConversationMemory(
+        summarizer=pipeline.summarize_conversation,
+        recent_messages=HISTORY_RECENT_MESSAGES,
+        summarize_every=HISTORY_SUMMARIZE_EVERY,
+        history_token_budget=HISTORY_TOKEN_BUDGET,
+        max_archive_bytes=HISTORY_MAX_ARCHIVE_BYTES
+    )
+conversation = st.session_state.conversation
 
-for message in st.session_state.messages:
+# Her rerun'da sadece son mesajlar çizilir; eskiler "önceki mesajlar" ile sayfa sayfa açılır
+CHAT_WINDOW_MESSAGES = 12
+CHAT_PAGE_SIZE = 12
+
+if "chat_window" not in st.session_state:
+    st.session_state.chat_window = CHAT_WINDOW_MESSAGES
+
+def load_earlier_messages():
+    st.session_state.chat_window += CHAT_PAGE_SIZE
+
+visible_messages, hidden_count = conversation.latest(st.session_state.chat_window)
+if hidden_count:
+    st.button(
+        f"⬆️ Önceki mesajlar ({hidden_count})",
+        on_click=load_earlier_messages,
+        use_container_width=True
+    )
+elif conversation.dropped_messages:
+    st.caption(f"🗂️ En eski {conversation.dropped_messages} mesaj bellek sınırı nedeniyle gösterilmiyor.")
+
+for message in visible_messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
         if message.get("category_info"):
             st.markdown(message["category_info"], unsafe_allow_html=True)
 
 if prompt := st.chat_input("Sorunuzu buraya yazın..."):
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    # Modele giden geçmiş yeni sorudan önceki konuşma (soru prompt'a ayrıca eklenir)
+    history = conversation.model_history()
+    conversation.add({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
 
     with st.chat_message("assistant"):
-        # ==================== 1. HIZLI ROUTİNG (Keyword) ====================
-        detected_category = classify_query_fast(prompt)
+        request_started = time.perf_counter()
+        
+        # ==================== 1. ROUTİNG (Keyword → Embedding) ====================
+        route = pipeline.route(prompt)
+        detected_category = route["detected_category"]
+        ranked_categories = route["ranked_categories"]
+        categories_to_search = route["categories_to_search"]
+        query_embedding = route["query_embedding"]
         
+        route_icon = "🧭" if route["embedding_routed"] else "⚡"
         if detected_category:
-            categories_to_search = [detected_category]
             info = COLLECTION_MAP[detected_category]
-            category_info_html = f'<div class="category-badge">⚡ {info["emoji"]} {info["name"]}</div>'
+            category_info_html = f'<div class="category-badge">{route_icon} {info["emoji"]} {info["name"]}</div>'
+        elif ranked_categories:
+            # Skorlar birbirine yakın: sadece öne çıkan kategorilerde ara
+            names = " / ".join(f'{COLLECTION_MAP[key]["emoji"]} {COLLECTION_MAP[key]["name"]}' for key in ranked_categories)
+            category_info_html = f'<div class="category-badge">{route_icon} {names}</div>'
         else:
-            # Keyword bulamazsa tüm kategorilerde ara
-            categories_to_search = list(COLLECTION_MAP.keys())
+            # Hiçbir router emin değilse tüm kategorilerde ara
             category_info_html = '<div class="category-badge">📚 Tüm Kategoriler</div>'
         
         st.markdown(category_info_html, unsafe_allow_html=True)
         
-        # ==================== 2. PARALEL ARAMA ====================
-        with st.spinner("📚 Belgeler taranıyor..."):
-            all_results = search_parallel(prompt, categories_to_search)
-        
-        if not all_results:
-            response_text = "Üzgünüm, bu konuyla ilgili belge bulunamadı."
-            st.warning(response_text)
-            st.session_state.messages.append({
-                "role": "assistant", 
-                "content": response_text,
-                "category_info": category_info_html
-            })
-            st.stop()
+        # ==================== 2. ÖNBELLEK KONTROLÜ ====================
+        cache_category = "+".join(categories_to_search)
+        # Geçmiş de prompt'a girdiği için anahtarın parçası; devam soruları
+        # sadece aynı bağlamda sorulmuş cevaplarla eşleşir
+        history_key = history_digest(history)
+        cached = answer_cache.get(prompt, cache_category, query_embedding, history_key)
         
-        # ==================== 3. TEK LLM ÇAĞRISI (Routing + Cevap) ====================
-        with st.spinner("✍️ Yanıt hazırlanıyor..."):
-            ai_response = get_answer_with_smart_routing(
-                prompt, 
-                all_results, 
-                st.session_state.messages
+        if cached:
+            st.caption("♻️ Benzer bir soru daha önce yanıtlandı, kayıtlı cevap gösteriliyor.")
+            used_results = cached["references"]
+            deltas = replay_cached_answer(cached["answer"])
+        else:
+            # ==================== 3. PARALEL ARAMA (aynı sorularla ortak) ====================
+            # Önbellekte olduğu gibi sadece aynı bağlamdaki (çoğunlukla ilk) aynı sorular birleşir
+            flight_key = (normalize_query(prompt), cache_category, history_key)
+            # Kısa ve tek kategorili net sorular hızlı modele, belirsizler gpt-4o'ya
+            tier = pipeline.choose_tier(prompt, route)
+            flight, is_leader = single_flight.do(
+                flight_key,
+                partial(answer_flight, prompt, categories_to_search, query_embedding, history, tier)
             )
+            metrics.inc("hukuk_single_flight_total", role="leader" if is_leader else "follower")
             
-            # Streaming yanıt
-            response_placeholder = st.empty()
-            full_response = ""
+            with st.spinner("📚 Belgeler taranıyor..."):
+                shared = flight.result()
+            all_results = shared["all_results"]
+            search_failures = shared["search_failures"]
             
-            for chunk in ai_response:
-                if chunk.choices[0].delta.content:
-                    full_response += chunk.choices[0].delta.content
-                    response_placeholder.markdown(full_response + "▌")
+            if not is_leader:
+                st.caption("🔗 Aynı soru şu an başka bir oturumda da yanıtlanıyor, cevap paylaşılıyor.")
             
-            response_placeholder.markdown(full_response)
+            if search_failures:
+                failed_names = ", ".join(COLLECTION_MAP[key]["name"] for key in search_failures)
+                st.warning(f"⚠️ {failed_names} kaynaklarına şu an ulaşılamadı, sonuçlar eksik olabilir.")
             
-            # Referansları göster
-            used_results = [r for r in all_results if r["category_key"] == detected_category] if detected_category else all_results[:4]
+            if not all_results:
+                if search_failures:
+                    response_text = "Üzgünüm, belge arşivine şu an ulaşılamıyor. Lütfen biraz sonra tekrar deneyin."
+                else:
+                    response_text = "Üzgünüm, bu konuyla ilgili belge bulunamadı."
+                st.warning(response_text)
+                conversation.add({
+                    "role": "assistant", 
+                    "content": response_text,
+                    "category_info": category_info_html
+                })
+                # st.stop() sayfanın sonundaki özetlemeye gelmeden çıkar
+                conversation.maybe_summarize()
+                st.stop()
             
+            # Token bütçesine göre en değerli, birbirini tekrar etmeyen parçalar
+            context_results = shared["context_results"]
+            used_results = [r for r in context_results if r["category_key"] == detected_category] if detected_category else context_results
+        
+        # ==================== 4. TEK LLM ÇAĞRISI (Routing + Cevap) ====================
+        with st.spinner("✍️ Yanıt hazırlanıyor..."):
+            if not cached:
+                # LLM akışı tek; her oturum parçaları baştan itibaren kendi placeholder'ına yazar
+                deltas = flight.stream()
+            
+            # Streaming yanıt (önbellekten gelen cevap da aynı yoldan akar)
+            renderer = ThrottledRenderer(
+                st.empty(),
+                min_interval=STREAM_FLUSH_INTERVAL,
+                min_chars=STREAM_FLUSH_CHARS
+            )
+            
+            # Referanslar cevaptan önce belli, stream sırasında gösterilebilir
             with st.expander("📍 Kullanılan Referanslar"):
                 for r in used_results:
                     st.write(f"- {r['emoji']} {r['filename']} (S. {r['page']}) - {r['category']}")
             
-            # OTOMATİK KANUN LİNKİ TESPİTİ
-            law_links = extract_law_links(full_response)
+            # OTOMATİK KANUN LİNKİ TESPİTİ (stream ile birlikte)
+            links_placeholder = st.empty()
+            law_extractor = IncrementalLawExtractor()
+            stream_started = time.monotonic()
+            first_link_seconds = None
+            law_link_seconds = 0.0
+            draft_notice = st.empty()
+            if not cached and tier["speculative"]:
+                draft_notice.caption("✏️ Hızlı taslak gösteriliyor, ayrıntılı cevap hazırlanıyor...")
+            
+            for delta in deltas:
+                if delta is DRAFT_RESET:
+                    # Asıl cevap başladı: taslağı ve taslaktan çıkan linkleri sil
+                    draft_notice.empty()
+                    renderer.reset()
+                    law_extractor = IncrementalLawExtractor()
+                    links_placeholder.empty()
+                    first_link_seconds = None
+                    continue
+                renderer.feed(delta)
+                mark = time.perf_counter()
+                links_changed = law_extractor.feed(delta)
+                law_link_seconds += time.perf_counter() - mark
+                if links_changed:
+                    if first_link_seconds is None:
+                        first_link_seconds = time.monotonic() - stream_started
+                    with links_placeholder.container():
+                        render_law_links(law_extractor.links)
+            
+            full_response = renderer.finish()
+            render_stats.record(renderer.stats)
             
-            if law_links:
-                with st.expander("🔗 Bahsedilen Kanunlar - Tam Metin"):
-                    st.markdown("**Yanıtta bahsedilen kanunların tam metinleri:**")
-                    st.markdown("")
-                    
-                    for law in law_links:
-                        st.markdown(f"📖 **{law['name']}**")
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.markdown(f"[📄 Tam Metin Oku (mevzuat.gov.tr)]({law['url']})")
-                        with col2:
-                            st.markdown(f"[⬇️ PDF İndir]({law['pdf']})")
-                        st.markdown("---")
-                    
-                    st.info("💡 **İpucu:** Linke tıkladıktan sonra sayfada Ctrl+F (veya Cmd+F) yaparak bahsedilen madde numarasını arayabilirsiniz.")
-
-        st.session_state.messages.append({
+            mark = time.perf_counter()
+            links_changed = law_extractor.finish()
+            law_link_seconds += time.perf_counter() - mark
+            metrics.observe("hukuk_stage_seconds", law_link_seconds, stage="law_links")
+            if links_changed:
+                if first_link_seconds is None:
+                    first_link_seconds = time.monotonic() - stream_started
+                with links_placeholder.container():
+                    render_law_links(law_extractor.links)
+            if first_link_seconds is not None:
+                render_stats.record_first_link(first_link_seconds)
+            
+            # Eksik sonuçlarla üretilen cevap önbelleğe yazılmaz
+            if not cached and is_leader and full_response and not search_failures:
+                answer_cache.put(prompt, cache_category, full_response, used_results, query_embedding, history_key)
+        
+        metrics.observe("hukuk_stage_seconds", time.perf_counter() - request_started, stage="request_cached" if cached else "request_total")
+        if METRICS_FILE:
+            metrics.write_file(METRICS_FILE)
+
+        conversation.add({
             "role": "assistant", 
             "content": full_response,
             "category_info": category_info_html
         })
+        # Cevap ekrandayken pencereden taşan turları özete kat
+        conversation.maybe_summarize()
 
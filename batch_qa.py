@@ -0,0 +1,330 @@
+"""Soru dosyalarını toplu cevaplama (QA regresyon setleri, toplu başvuru formları)
+
+Arayüzdeki hattın aynısını kullanır: classify_query_fast → search_parallel →
+get_answer_with_smart_routing. Sorular kategoriye göre gruplanır; her partinin
+soruları tek bir embedding isteğiyle vektörleştirilir, aramalar bu hazır
+vektörlerle yapılır. Cevaplar asyncio ile sınırlı eşzamanlılıkta üretilir.
+OpenAI ve Weaviate istekleri ayrı hız sınırlarından geçer; geçici hatalar
+(429, 5xx, zaman aşımı, bağlantı) üstel bekleme ile tekrar denenir.
+
+Çıktı dosyası aynı zamanda kontrol noktasıdır: yeniden çalıştırıldığında
+dosyada cevabı olan sorular atlanır, kalan yerden devam edilir.
+
+    python batch_qa.py sorular.jsonl --output cevaplar.jsonl --concurrency 8
+    python batch_qa.py sorular.txt --output cevaplar.jsonl --openai-rpm 300 --summary ozet.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from functools import partial
+
+import numpy as np
+import openai
+from openai import OpenAI
+
+from law_links import extract_law_links
+from pipeline import Pipeline, stream_deltas
+from settings import connect_weaviate, load_secrets
+
+ALL_CATEGORIES = "*"
+
+
+# --- GİRDİ / KONTROL NOKTASI ---
+def load_questions(path):
+    """Düz metin (satır başına bir soru) ya da JSONL; kimlik yoksa satır numarası kullanılır"""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = {}
+            if line.startswith("{"):
+                record = json.loads(line)
+                line = record.get("question") or record.get("query") or record.get("title") or ""
+            if line:
+                question_id = record.get("id") or record.get("request_id") or f"line-{line_number}"
+                questions.append({"id": str(question_id), "question": line})
+    return questions
+
+
+def load_checkpoint(path):
+    """Çıktı dosyasında tamamlanmış soru kimlikleri (yarım kalmış son satır yok sayılır)"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (json.JSONDecodeError, KeyError):
+                continue
+    return done
+
+
+def open_output(path):
+    """Ekleme kipinde aç; çökme yarım satır bıraktıysa yeni kayıt yeni satırdan başlasın"""
+    needs_newline = False
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    output = open(path, "a", encoding="utf-8")
+    if needs_newline:
+        output.write("\n")
+    return output
+
+
+# --- HIZ SINIRI VE TEKRAR DENEME ---
+class AsyncRateLimiter:
+    """Saniyede `rate` istek, en fazla `burst` birikimli (token bucket)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate or 0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _retry_after(error):
+    """429 cevaplarındaki Retry-After başlığı (saniye), yoksa None"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class SearchUnavailable(Exception):
+    """Aranan collection'ların hiçbiri cevap vermedi (tekrar denenir)"""
+
+
+def is_retryable(error):
+    """Tekrar denemenin işe yarayabileceği hatalar: 429, 5xx, zaman aşımı, bağlantı.
+
+    400, kimlik doğrulama ve benzeri istemci hataları tekrar denense de
+    aynı sonucu verir, hemen yükseltilir.
+    """
+    if isinstance(error, (SearchUnavailable, TimeoutError, ConnectionError,
+                          openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+async def with_backoff(call, limiters, retries=5, base_delay=1.0, max_delay=60.0):
+    """call()'ı thread'de çalıştır; geçici hatada üstel bekleme (+ rastgele sapma) ile tekrar dene"""
+    for attempt in range(retries + 1):
+        for limiter in limiters:
+            await limiter.acquire()
+        try:
+            return await asyncio.to_thread(call)
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            delay = _retry_after(e) or min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"⏳ {type(e).__name__}, {delay:.1f} sn sonra tekrar ({attempt + 1}/{retries})", file=sys.stderr)
+            await asyncio.sleep(delay)
+
+
+# --- HAT ---
+class BatchRunner:
+    """Soruları kategori partileri halinde vektörleştirip arar, cevapları sınırlı eşzamanlılıkla üretip çıktıya yazar"""
+
+    def __init__(self, pipeline, output, concurrency=4, batch_size=16, openai_rps=None, weaviate_rps=None, retries=5):
+        self.pipeline = pipeline
+        self.output = output
+        self.batch_size = batch_size
+        self.retries = retries
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.openai = AsyncRateLimiter(openai_rps)
+        self.weaviate = AsyncRateLimiter(weaviate_rps)
+        self.latencies = []
+        self.stats = Counter()
+
+    def group_by_category(self, questions):
+        """Keyword router'la kategori; aynı collection'ları arayan sorular art arda işlenir"""
+        groups = defaultdict(list)
+        for item in questions:
+            groups[self.pipeline.classify_query_fast(item["question"]) or ALL_CATEGORIES].append(item)
+        return groups
+
+    async def embed_batch(self, batch):
+        """Partinin sorularını tek embedding isteğiyle vektörleştir; olmazsa her soru kendi vektörünü alır"""
+        questions = [item["question"] for item in batch]
+        try:
+            return await with_backoff(
+                partial(self.pipeline.query_embedder.embed_many, questions),
+                [self.openai],
+                retries=self.retries
+            )
+        except Exception as e:
+            print(f"⚠️ Toplu embedding başarısız ({type(e).__name__}), sorular tek tek vektörleştirilecek", file=sys.stderr)
+            return [None] * len(batch)
+
+    async def search(self, item, category, vector=None):
+        category_keys = list(self.pipeline.collection_map) if category == ALL_CATEGORIES else [category]
+
+        def call():
+            results, failures = self.pipeline.search_parallel(item["question"], category_keys, vector)
+            if failures and not results:
+                raise SearchUnavailable(", ".join(f"{key}: {reason}" for key, reason in failures.items()))
+            return results, failures
+
+        # Vektör hazır değilse search_parallel önce soruyu OpenAI ile vektörleştirir
+        limiters = [self.weaviate] if vector is not None else [self.openai, self.weaviate]
+        return await with_backoff(call, limiters, retries=self.retries)
+
+    async def answer(self, item, category, results, failures, started):
+        try:
+            context_results, _ = self.pipeline.build_context(results)
+
+            def call():
+                ai_response = self.pipeline.get_answer_with_smart_routing(item["question"], context_results, [])
+                return "".join(stream_deltas(ai_response, self.pipeline.record_usage))
+
+            answer = await with_backoff(call, [self.openai], retries=self.retries) if context_results else ""
+            record = {
+                "id": item["id"],
+                "question": item["question"],
+                "category": None if category == ALL_CATEGORIES else category,
+                "answer": answer,
+                "references": [
+                    {"filename": r["filename"], "page": r["page"], "category": r["category_key"]}
+                    for r in context_results
+                ],
+                "law_links": extract_law_links(answer),
+                "search_failures": failures,
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+            # Tek event loop thread'i yazar; her kayıt hemen diske iner (kontrol noktası)
+            self.output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.output.flush()
+            self.latencies.append(record["seconds"])
+            self.stats["answered"] += 1
+            self.stats[f"category:{record['category'] or ALL_CATEGORIES}"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"❌ {item['id']}: {type(e).__name__}: {e}", file=sys.stderr)
+        finally:
+            self.semaphore.release()
+
+    async def run_batch(self, batch, category):
+        """Parti tek istekte vektörleştirilir; her soru kendi eşzamanlılık yuvasıyla aranıp cevaplanır"""
+        vectors = await self.embed_batch(batch)
+        tasks = []
+        for item, vector in zip(batch, vectors):
+            # Yuva aramadan önce alınır: cevaplar yetişemiyorsa yeni arama başlamaz
+            await self.semaphore.acquire()
+            tasks.append(asyncio.create_task(self._search_then_answer(item, category, vector)))
+        return tasks
+
+    async def _search_then_answer(self, item, category, vector=None):
+        started = time.perf_counter()
+        try:
+            results, failures = await self.search(item, category, vector)
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"❌ {item['id']}: {type(e).__name__}: {e}", file=sys.stderr)
+            self.semaphore.release()
+            return
+        await self.answer(item, category, results, failures, started)
+
+    async def run(self, questions):
+        tasks = []
+        for category, items in self.group_by_category(questions).items():
+            for start in range(0, len(items), self.batch_size):
+                tasks.extend(await self.run_batch(items[start:start + self.batch_size], category))
+        await asyncio.gather(*tasks)
+
+
+def summarize(runner, total, skipped, elapsed):
+    latencies = np.array(runner.latencies) if runner.latencies else np.zeros(1)
+    return {
+        "questions": total,
+        "skipped_from_checkpoint": skipped,
+        "answered": runner.stats["answered"],
+        "failed": runner.stats["failed"],
+        "seconds": round(elapsed, 2),
+        "questions_per_minute": round(runner.stats["answered"] / elapsed * 60, 2) if elapsed else 0.0,
+        "latency_p50": float(np.percentile(latencies, 50)),
+        "latency_p95": float(np.percentile(latencies, 95)),
+        "by_category": {
+            key.split(":", 1)[1]: count for key, count in runner.stats.items() if key.startswith("category:")
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soru dosyasını toplu cevapla (JSONL çıktı, kaldığı yerden devam)")
+    parser.add_argument("questions", help="Düz metin veya JSONL (question/query/title, isteğe bağlı id)")
+    parser.add_argument("--output", required=True, help="Cevaplar (JSONL); varsa tamamlananlar atlanır")
+    parser.add_argument("--concurrency", type=int, default=4, help="Aynı anda işlenen soru sayısı")
+    parser.add_argument("--batch-size", type=int, default=16, help="Aynı kategoride tek embedding isteğinde vektörleştirilen soru sayısı")
+    parser.add_argument("--openai-rpm", type=float, default=500, help="OpenAI istek/dakika sınırı (0: sınırsız)")
+    parser.add_argument("--weaviate-rps", type=float, default=20, help="Weaviate arama/saniye sınırı (0: sınırsız)")
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--summary", help="Özeti JSON olarak bu dosyaya da yaz")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    done = load_checkpoint(args.output)
+    pending = [item for item in questions if item["id"] not in done]
+    print(f"📋 {len(questions)} soru, {len(questions) - len(pending)} tanesi önceki çalıştırmada cevaplanmış")
+
+    secrets = load_secrets()
+    client = connect_weaviate(secrets)
+    pipeline = Pipeline(client, OpenAI(api_key=secrets["OPENAI_API_KEY"]))
+    started = time.perf_counter()
+    try:
+        with open_output(args.output) as output:
+            runner = BatchRunner(
+                pipeline,
+                output,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                openai_rps=args.openai_rpm / 60,
+                weaviate_rps=args.weaviate_rps,
+                retries=args.retries
+            )
+            asyncio.run(runner.run(pending))
+    finally:
+        client.close()
+
+    summary = summarize(runner, len(questions), len(questions) - len(pending), time.perf_counter() - started)
+    print(
+        f"✅ {summary['answered']} cevap, {summary['failed']} hata, {summary['seconds']} sn "
+        f"({summary['questions_per_minute']} soru/dk), p50 {summary['latency_p50']:.1f} sn, "
+        f"p95 {summary['latency_p95']:.1f} sn"
+    )
+    for category, count in sorted(summary["by_category"].items()):
+        print(f"   {category}: {count}")
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
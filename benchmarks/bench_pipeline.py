@@ -0,0 +1,180 @@
+"""Uçtan uca hat benchmark'ı ve yük testi (Streamlit, Weaviate ve OpenAI olmadan)
+
+Gerçek istemciler yerine gecikmesi ayarlanabilen sahte istemcilerle
+routing → search_parallel → get_answer_with_smart_routing → stream hattını
+verilen eşzamanlılıkta çalıştırır ve aşama sürelerinin p50/p95/p99
+değerlerini raporlar.
+
+    python -m benchmarks.bench_pipeline --concurrency 8 --repeat 5
+    python -m benchmarks.bench_pipeline --queries requests.jsonl --max-p95-total 6
+    python -m benchmarks.bench_pipeline --backend local   # Weaviate yerine yerel indeks
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+import numpy as np
+
+from benchmarks.fakes import DEFAULT_QUERIES, FakeOpenAI, FakeWeaviateClient, LatencyModel, fake_embedding
+from categories import COLLECTION_MAP
+from law_links import IncrementalLawExtractor
+from pipeline import Pipeline
+from retrievers import LocalHybridRetriever, write_local_index
+from tiering import DRAFT_RESET
+
+STAGES = ["routing", "retrieval", "context", "first_token", "total"]
+
+
+def load_queries(path):
+    """Düz metin (satır başına bir soru) ya da JSONL (question/query/title alanı)"""
+    if not path:
+        return list(DEFAULT_QUERIES)
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                line = record.get("question") or record.get("query") or record.get("title") or ""
+            if line:
+                queries.append(line)
+    return queries
+
+
+def run_one(pipeline, query, tiering=False):
+    """Tek soruyu hattan geçir, aşama sürelerini (saniye) döndür"""
+    timings = {}
+    start = time.perf_counter()
+
+    route = pipeline.route(query)
+    timings["routing"] = time.perf_counter() - start
+
+    mark = time.perf_counter()
+    results, failures = pipeline.search_parallel(query, route["categories_to_search"], route["query_embedding"])
+    timings["retrieval"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    context_results, _ = pipeline.build_context(results)
+    timings["context"] = time.perf_counter() - mark
+
+    extractor = IncrementalLawExtractor()
+    tier = pipeline.choose_tier(query, route) if tiering else None
+    for delta in pipeline.stream_answer(query, context_results, [], tier):
+        if delta is DRAFT_RESET:
+            extractor = IncrementalLawExtractor()
+            continue
+        if "first_token" not in timings:
+            timings["first_token"] = time.perf_counter() - start
+        extractor.feed(delta)
+    extractor.finish()
+
+    timings["total"] = time.perf_counter() - start
+    timings.setdefault("first_token", timings["total"])
+    timings["failures"] = len(failures)
+    return timings
+
+
+def build_local_retriever(weaviate_client, path):
+    """Sahte collection'ların aynısını yerel indekse yaz (vektörler sahte embedding'le)"""
+    for info in COLLECTION_MAP.values():
+        documents = [
+            {"content": doc["content"], "filename": doc["filename"], "page": doc["page_number"]}
+            for doc in weaviate_client.documents(info["collection"])
+        ]
+        vectors = [fake_embedding(doc["content"]) for doc in documents]
+        write_local_index(f"{path}/{info['collection']}", documents, vectors)
+    return LocalHybridRetriever(path)
+
+
+def summarize(samples):
+    summary = {}
+    for stage in STAGES:
+        values = np.array([s[stage] for s in samples]) * 1000
+        summary[stage] = {
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "p99": float(np.percentile(values, 99)),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte servislerle uçtan uca hat benchmark'ı")
+    parser.add_argument("--queries", help="Soru dosyası (düz metin veya JSONL)")
+    parser.add_argument("--repeat", type=int, default=3, help="Soru listesinin kaç kez tekrarlanacağı")
+    parser.add_argument("--concurrency", type=int, default=4, help="Aynı anda işlenen soru sayısı")
+    parser.add_argument("--search-latency", type=float, default=0.08, help="Weaviate sorgu medyanı (sn)")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="Embedding medyanı (sn)")
+    parser.add_argument("--first-token-latency", type=float, default=0.4, help="LLM ilk token medyanı (sn)")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--answer-tokens", type=int, default=300)
+    parser.add_argument("--tail-sigma", type=float, default=0.4, help="Gecikme dağılımının kuyruk genişliği")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Sahte Weaviate hata oranı")
+    parser.add_argument("--backend", choices=["weaviate", "local"], default="weaviate",
+                        help="local: sahte belgelerden yerel BM25 + vektör indeksi kurup onunla ara")
+    parser.add_argument("--tiering", action="store_true", help="Soruları model kademesi politikasıyla yönlendir")
+    parser.add_argument("--speculative", action="store_true", help="Güçlü modele gidenlerde hızlı taslak (--tiering ile)")
+    parser.add_argument("--output", help="Özeti JSON olarak bu dosyaya yaz")
+    parser.add_argument("--max-p95-total", type=float, help="p95 toplam süre bunu (sn) aşarsa çıkış kodu 1")
+    args = parser.parse_args()
+
+    weaviate_client = FakeWeaviateClient(
+        LatencyModel(args.search_latency, args.tail_sigma, seed=1),
+        failure_rate=args.failure_rate
+    )
+    ai_client = FakeOpenAI(
+        embed_latency=LatencyModel(args.embed_latency, args.tail_sigma, seed=2),
+        first_token_latency=LatencyModel(args.first_token_latency, args.tail_sigma, seed=3),
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens
+    )
+    queries = load_queries(args.queries) * args.repeat
+    with ExitStack() as stack:
+        retriever = None
+        if args.backend == "local":
+            index_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            retriever = build_local_retriever(weaviate_client, index_dir)
+        pipeline = Pipeline(weaviate_client, ai_client, retriever=retriever)
+        pipeline.tier_policy.speculative = args.speculative
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            samples = list(executor.map(lambda q: run_one(pipeline, q, args.tiering), queries))
+        elapsed = time.perf_counter() - started
+
+    summary = summarize(samples)
+    print(f"{len(samples)} soru, eşzamanlılık {args.concurrency}, {elapsed:.1f} sn "
+          f"({len(samples) / elapsed:.1f} soru/sn), {sum(s['failures'] for s in samples)} arama hatası\n")
+    print(f"{'aşama (ms)':<12} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for stage in STAGES:
+        row = summary[stage]
+        print(f"{stage:<12} {row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f}")
+
+    usage = pipeline.prompt_cache_snapshot()
+    print()
+    for model, stats in sorted(usage.items()):
+        if stats["prompt_tokens"]:
+            print(f"prompt önbelleği ({model}): {stats['cached_tokens']}/{stats['prompt_tokens']} token "
+                  f"(%{100 * stats['cached_tokens'] / stats['prompt_tokens']:.0f})")
+
+    for tier_name, totals in sorted(pipeline.tier_telemetry.totals.items()):
+        print(f"{tier_name} kademe: {totals['answers']} cevap, ${totals['cost_usd']:.4f}, "
+              f"ort. {totals['seconds'] / totals['answers']:.2f} sn")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "summary": summary, "prompt_cache": usage}, f, indent=2)
+
+    if args.max_p95_total is not None and summary["total"]["p95"] > args.max_p95_total * 1000:
+        print(f"\n❌ p95 toplam süre {summary['total']['p95']:.0f} ms > {args.max_p95_total * 1000:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Benchmark için Weaviate ve OpenAI istemcilerinin yerel taklitleri
+
+Gecikmeler log-normal dağılımdan çekilir (medyan + kuyruk genişliği), böylece
+gerçek servislerdeki gibi ara sıra yavaş cevaplar da oluşur.
+"""
+import hashlib
+import math
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+DEFAULT_QUERIES = [
+    "Kira artışı ne kadar olabilir?",
+    "Kira artış oranı nedir?",
+    "Ev sahibi beni tahliye edebilir mi?",
+    "Depozitomu geri alamıyorum, ne yapmalıyım?",
+    "Kira sözleşmesi bitmeden çıkarsam ne olur?",
+    "Patronum beni haksız yere kovdu, kıdem tazminatı alabilir miyim?",
+    "Fazla mesai ücretimi ödemiyorlar.",
+    "İstifa edersem tazminat alabilir miyim?",
+    "İşe iade davası nasıl açılır?",
+    "Komşumun ağacı bahçeme taşıyor, ne yapabilirim?",
+    "Miras paylaşımında anlaşamıyoruz.",
+    "Boşanma davası ne kadar sürer?",
+]
+
+_SENTENCES = [
+    "Kiracı, kira bedelini sözleşmede belirlenen zamanda ödemekle yükümlüdür.",
+    "Kiraya veren, kiralananı sözleşmeye uygun kullanıma elverişli durumda teslim etmelidir.",
+    "Yenilenen kira dönemlerinde artış oranı TÜFE on iki aylık ortalamasını geçemez.",
+    "Tahliye taahhüdü yazılı olarak verilmiş olmalıdır.",
+    "İşveren, işçinin fazla çalışma ücretini yüzde elli zamlı ödemek zorundadır.",
+    "Kıdem tazminatı için işçinin en az bir yıl çalışmış olması gerekir.",
+    "Fesih bildirimi yazılı yapılmalı ve fesih sebebi açıkça belirtilmelidir.",
+    "İşe iade davası fesih bildiriminden itibaren bir ay içinde açılmalıdır.",
+]
+
+_ANSWER = (
+    "Kiracı olarak **TBK Madde 299**'da belirtilen haklara sahipsiniz. Bu maddeye göre kiraya veren "
+    "kiralananı kullanıma elverişli durumda teslim etmekle yükümlüdür. Kira artışı konusunda "
+    "**Türk Borçlar Kanunu'nun 344. maddesi** uygulanır. İş ilişkilerinde ise **4857 sayılı Kanun m. 17** "
+    "bildirim sürelerini düzenler. "
+)
+
+
+class LatencyModel:
+    """Medyanı ve kuyruk genişliği (sigma) verilen log-normal gecikme"""
+
+    def __init__(self, median, sigma=0.4, seed=None):
+        self.median = median
+        self.sigma = sigma
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        if self.median <= 0:
+            return 0.0
+        with self._lock:
+            return self.median * math.exp(self._rng.gauss(0.0, self.sigma))
+
+    def sleep(self):
+        time.sleep(self.sample())
+
+
+def _seed(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def fake_embedding(text, dim=256):
+    """Metinden deterministik birim vektör"""
+    vector = np.random.default_rng(_seed(text)).standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+# --- WEAVIATE ---
+class _FakeQuery:
+    def __init__(self, collection_name, documents, latency):
+        self._name = collection_name
+        self._documents = documents
+        self._latency = latency
+
+    def hybrid(self, query, limit=10, **kwargs):
+        self._latency.sleep()
+        rng = random.Random(_seed(self._name + query))
+        picked = rng.sample(self._documents, min(limit, len(self._documents)))
+        objects = [
+            SimpleNamespace(properties=doc, metadata=SimpleNamespace(score=1.0 / (rank + 1)))
+            for rank, doc in enumerate(picked)
+        ]
+        return SimpleNamespace(objects=objects)
+
+
+class FakeWeaviateClient:
+    """collections.get(name).query.hybrid(...) arayüzünü taklit eder"""
+
+    def __init__(self, search_latency, documents_per_collection=200, failure_rate=0.0, seed=0):
+        self.search_latency = search_latency
+        self.documents_per_collection = documents_per_collection
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._collections = {}
+        self._lock = threading.Lock()
+        self.collections = SimpleNamespace(get=self._get)
+
+    def documents(self, name):
+        """Collection'ın sahte sayfaları (her çağrıda aynı içerik)"""
+        rng = random.Random(_seed(name))
+        return [{
+            "content": " ".join(rng.choice(_SENTENCES) for _ in range(rng.randint(4, 12))),
+            "filename": f"{name.lower()}_{i // 20:03d}.pdf",
+            "page_number": i % 20 + 1,
+        } for i in range(self.documents_per_collection)]
+
+    def _get(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = SimpleNamespace(
+                    query=_FakeQuery(name, self.documents(name), self.search_latency)
+                )
+            if self.failure_rate and self._rng.random() < self.failure_rate:
+                raise ConnectionError(f"{name} için sahte bağlantı hatası")
+            return self._collections[name]
+
+    def close(self):
+        pass
+
+
+# --- OPENAI ---
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class FakeOpenAI:
+    """embeddings.create ve chat.completions.create(stream=True) taklidi"""
+
+    def __init__(self, embed_latency, first_token_latency, tokens_per_second=60.0, answer_tokens=300):
+        self.embed_latency = embed_latency
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.answer_tokens = answer_tokens
+        self.embeddings = SimpleNamespace(create=self._embed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._complete))
+        self._seen_prompts = []
+        self._lock = threading.Lock()
+
+    def _embed(self, model, input, **kwargs):
+        self.embed_latency.sleep()
+        inputs = [input] if isinstance(input, str) else input
+        return SimpleNamespace(data=[SimpleNamespace(embedding=fake_embedding(text)) for text in inputs])
+
+    def _usage(self, messages):
+        """Sağlayıcı önbelleği taklidi: önceki isteklerle ortak önek, 1024 token'dan itibaren 128'lik bloklar"""
+        prompt = "".join(m["content"] for m in messages)
+        with self._lock:
+            shared = max((len(os.path.commonprefix([prompt, seen])) for seen in self._seen_prompts), default=0)
+            self._seen_prompts.append(prompt)
+            del self._seen_prompts[:-32]
+        prompt_tokens, shared_tokens = len(prompt) // 4, shared // 4
+        cached = shared_tokens // 128 * 128 if shared_tokens >= 1024 else 0
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+            completion_tokens=0
+        )
+
+    def _complete(self, model, messages, stream=False, stream_options=None, **kwargs):
+        answer = (_ANSWER * (self.answer_tokens // 60 + 1))
+        # Yaklaşık 4 karakter = 1 token
+        tokens = [answer[i:i + 4] for i in range(0, min(len(answer), self.answer_tokens * 4), 4)]
+        usage = self._usage(messages)
+        usage.completion_tokens = len(tokens)
+
+        def generate():
+            self.first_token_latency.sleep()
+            interval = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+            for token in tokens:
+                yield _chunk(token)
+                if interval:
+                    time.sleep(interval)
+            if stream_options and stream_options.get("include_usage"):
+                yield SimpleNamespace(choices=[], usage=usage)
+
+        return generate()
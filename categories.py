@@ -0,0 +1,17 @@
+"""Hukuk kategorileri ve bağlı Weaviate collection'ları"""
+
+# --- KATEGORİ TANIMLARI ---
+COLLECTION_MAP = {
+    "kira_hukuku": {
+        "collection": "HukukDoc",
+        "name": "Kira Hukuku",
+        "keywords": ["kira", "kiracı", "kiraya veren", "tahliye", "kira bedeli", "kiralama", "kira sözleşmesi", "kira artışı", "depozito", "ev sahibi"],
+        "emoji": "🏠"
+    },
+    "is_hukuku": {
+        "collection": "IsDavalari",
+        "name": "İş Hukuku",
+        "keywords": ["işçi", "işveren", "iş sözleşmesi", "işten çıkarma", "kıdem", "fazla mesai", "iş akdi", "çalışan", "istifa", "tazminat", "işe iade", "patron", "kovdu", "işsiz"],
+        "emoji": "💼"
+    }
+}
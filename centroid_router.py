@@ -0,0 +1,143 @@
+"""Kategori merkez vektörleriyle (centroid) embedding tabanlı routing
+
+Keyword routing sonuç vermediğinde tüm collection'larda aramak yerine,
+sorunun embedding'i her kategorinin merkez vektörleriyle karşılaştırılır
+ve sadece güvenilir kategorilerde arama yapılır.
+
+Merkezleri hesaplamak için (collection'lardaki mevcut vektörlerden):
+    python centroid_router.py --output centroids.npz
+"""
+import argparse
+
+import numpy as np
+
+from categories import COLLECTION_MAP
+from settings import connect_weaviate, load_secrets
+
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def object_vector(obj):
+    """Weaviate nesnesinin varsayılan vektörü (adlandırılmış vektör de olabilir)"""
+    vector = obj.vector
+    if isinstance(vector, dict):
+        vector = vector.get("default") or next(iter(vector.values()), None)
+    return vector
+
+
+def kmeans_centroids(vectors, k, iterations=20, seed=0):
+    """Birim vektörler için küçük bir küresel k-means"""
+    vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+    k = min(k, len(vectors))
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)]
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        updated = np.stack([
+            vectors[assignment == i].mean(axis=0) if np.any(assignment == i) else centroids[i]
+            for i in range(k)
+        ])
+        updated = normalize_rows(updated)
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+    return centroids
+
+
+def build_centroids(client, collection_map, per_category=4, max_objects=5000):
+    """Her kategori için collection vektörlerinden merkezler hesapla"""
+    centroids, labels = [], []
+    for key, info in collection_map.items():
+        collection = client.collections.get(info["collection"])
+        vectors = []
+        for obj in collection.iterator(include_vector=True, return_properties=[]):
+            vector = object_vector(obj)
+            if vector is not None:
+                vectors.append(vector)
+            if len(vectors) >= max_objects:
+                break
+        if not vectors:
+            print(f"⚠️ {info['collection']} collection'ında vektör bulunamadı, atlanıyor")
+            continue
+
+        category_centroids = kmeans_centroids(vectors, per_category)
+        centroids.append(category_centroids)
+        labels.extend([key] * len(category_centroids))
+        print(f"✅ {key}: {len(vectors)} vektör → {len(category_centroids)} merkez")
+
+    if not centroids:
+        raise ValueError("Hiçbir collection'da vektör bulunamadı, merkez hesaplanamadı")
+    return np.concatenate(centroids).astype(np.float32), np.array(labels)
+
+
+class CentroidRouter:
+    """Sorgu vektörünü kategori merkezleriyle tek matris çarpımında karşılaştırır"""
+
+    def __init__(self, centroids, labels, min_similarity=0.3, margin=0.03):
+        self.centroids = normalize_rows(np.asarray(centroids, dtype=np.float32))
+        self.labels = np.asarray(labels)
+        self.categories = list(dict.fromkeys(self.labels.tolist()))
+        self.min_similarity = min_similarity
+        self.margin = margin
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        data = np.load(path, allow_pickle=False)
+        return cls(data["centroids"], data["labels"], **kwargs)
+
+    def save(self, path):
+        np.savez_compressed(path, centroids=self.centroids, labels=self.labels)
+
+    def scores(self, vector):
+        """Her kategori için en yakın merkezin kosinüs benzerliği"""
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return {}
+        similarities = self.centroids @ (vector / norm)
+        return {
+            category: float(similarities[self.labels == category].max())
+            for category in self.categories
+        }
+
+    def route(self, vector):
+        """Güvenilir kategorileri döndür; emin değilse boş liste (→ tüm collection'larda ara)"""
+        scores = self.scores(vector)
+        if not scores:
+            return []
+        best = max(scores.values())
+        if best < self.min_similarity:
+            return []
+        return sorted(
+            (category for category, score in scores.items() if score >= best - self.margin),
+            key=scores.get,
+            reverse=True
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kategori merkez vektörlerini hesapla")
+    parser.add_argument("--output", default="centroids.npz")
+    parser.add_argument("--per-category", type=int, default=4, help="Kategori başına merkez sayısı")
+    parser.add_argument("--max-objects", type=int, default=5000, help="Collection başına okunacak en fazla nesne")
+    args = parser.parse_args()
+
+    client = connect_weaviate(load_secrets())
+    try:
+        centroids, labels = build_centroids(client, COLLECTION_MAP, args.per_category, args.max_objects)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    finally:
+        client.close()
+
+    CentroidRouter(centroids, labels).save(args.output)
+    print(f"💾 {len(labels)} merkez kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
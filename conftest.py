@@ -0,0 +1 @@
+# Kök dizindeki modüller (router, law_links, ...) testlerden doğrudan import edilebilsin diye
@@ -0,0 +1,172 @@
+"""Token bütçeli, tekrarları ayıklanmış ve çeşitliliği korunmuş context hazırlama"""
+import logging
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_ENCODING = "o200k_base"  # gpt-4o / gpt-4o-mini tokenizer'ı
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?…:;])\s+")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_LAST_WORD_RE = re.compile(r"\s+\S*$")
+
+# Paketleyiciden önceki yöntem: her kategoriden ilk 2 parça, 600 karakter (tasarruf buna göre ölçülür)
+BASELINE_CHUNKS_PER_CATEGORY = 2
+BASELINE_CHUNK_CHARS = 600
+
+# MinHash parametreleri (sabit tohumla, süreçler arası aynı imzalar)
+_MINHASH_PERMUTATIONS = 64
+_MINHASH_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_MINHASH_A = _rng.integers(1, _MINHASH_PRIME, size=_MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = _rng.integers(0, _MINHASH_PRIME, size=_MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """tiktoken yoksa (veya encoding indirilemezse) None; o zaman tahmini sayım yapılır"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception:
+        logger.warning("tiktoken kullanılamıyor, token sayıları tahmini hesaplanacak")
+        return None
+
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding is None:
+        return max(1, len(text) // 4) if text else 0
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Metni cümle sınırında, token sınırına sığacak şekilde kısalt"""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept, used = [], 0
+    for sentence in _SENTENCE_RE.split(text):
+        tokens = count_tokens(sentence) + 1
+        if used + tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used += tokens
+    if kept:
+        return " ".join(kept)
+
+    # İlk cümle bile sığmıyorsa token sınırında kes, kelimenin ortasında
+    # kalmamak için son boşluğa geri çekil (boşluk yoksa sert kes)
+    encoding = _get_encoding()
+    if encoding is None:
+        cut = text[:max_tokens * 4]
+    else:
+        cut = encoding.decode(encoding.encode(text)[:max_tokens])
+    boundary = _LAST_WORD_RE.search(cut)
+    if boundary and boundary.start() > 0:
+        return cut[:boundary.start()]
+    return cut
+
+
+def baseline_context_tokens(results):
+    """Eski yöntemin (kategori başına 2 parça, 600 karakter) bu sonuçlarla harcayacağı token"""
+    by_category = {}
+    for result in results:
+        by_category.setdefault(result.get("category_key"), []).append(result)
+    return sum(
+        count_tokens(f"[KAYNAK: {r['filename']} S.{r['page']}]\n{r['content'][:BASELINE_CHUNK_CHARS]}...\n\n")
+        for category_results in by_category.values()
+        for r in category_results[:BASELINE_CHUNKS_PER_CATEGORY]
+    )
+
+
+def minhash_signature(text, shingle_size=5):
+    """Kelime shingle'larından MinHash imzası"""
+    words = _WORD_RE.findall(text.lower())
+    size = min(shingle_size, len(words)) or 1
+    shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles], dtype=np.uint64)
+    return ((_MINHASH_A[:, None] * hashes[None, :] + _MINHASH_B[:, None]) % _MINHASH_PRIME).min(axis=1)
+
+
+def estimated_jaccard(signature_a, signature_b):
+    return float(np.mean(signature_a == signature_b))
+
+
+def pack_context(results, token_budget=None, chunk_max_tokens=150, duplicate_threshold=0.8, mmr_lambda=0.7):
+    """En değerli parçaları token bütçesine yerleştir.
+
+    results önem sırasına göre gelir (search_parallel'in birleşik sıralaması).
+    Neredeyse aynı parçalar (bitişik sayfalar vb.) MinHash ile atılır; kalanlar
+    MMR ile seçilir: alaka puanı yüksek ama seçilenlere benzemeyen parça önce.
+    token_budget verilmezse eski yöntemin (baseline_context_tokens) aynı
+    sonuçlarla harcayacağı token kullanılır; prompt hiçbir zaman büyümez.
+    Dönüş: (seçilen sonuçlar, istatistik sözlüğü)
+    """
+    baseline_tokens = baseline_context_tokens(results)
+    if token_budget is None:
+        token_budget = baseline_tokens
+
+    candidates = []
+    total_tokens = 0
+    for rank, result in enumerate(results):
+        tokens = count_tokens(result["content"])
+        total_tokens += tokens
+        candidates.append({
+            "result": result,
+            "relevance": 1.0 - rank / len(results),
+            "signature": minhash_signature(result["content"])
+        })
+
+    # Neredeyse aynı parçaları ayıkla (daha önemli olanı kalır)
+    unique = []
+    for candidate in candidates:
+        if all(estimated_jaccard(candidate["signature"], u["signature"]) < duplicate_threshold for u in unique):
+            unique.append(candidate)
+
+    selected, used_tokens = [], 0
+    remaining = list(unique)
+    while remaining and used_tokens < token_budget:
+        def mmr(candidate):
+            redundancy = max(
+                (estimated_jaccard(candidate["signature"], s["signature"]) for s in selected),
+                default=0.0
+            )
+            return mmr_lambda * candidate["relevance"] - (1 - mmr_lambda) * redundancy
+
+        best = max(remaining, key=mmr)
+        remaining.remove(best)
+
+        header = f"[KAYNAK: {best['result']['filename']} S.{best['result']['page']}]\n"
+        available = min(chunk_max_tokens, token_budget - used_tokens) - count_tokens(header)
+        if available <= 0:
+            break
+        content = truncate_to_tokens(best["result"]["content"], available)
+        tokens = count_tokens(header + content)
+        # Başlık ve metin birlikte sayılınca bir iki token fazla çıkabilir
+        if not content or used_tokens + tokens > token_budget:
+            continue
+        selected.append(best)
+        best["packed"] = dict(best["result"], content=content)
+        used_tokens += tokens
+
+    stats = {
+        "candidates": len(results),
+        "duplicates": len(candidates) - len(unique),
+        "selected": len(selected),
+        "candidate_tokens": total_tokens,
+        "baseline_tokens": baseline_tokens,
+        "context_tokens": used_tokens,
+        # Eksi değer ancak token_budget elle eski kesimden yüksek verilirse çıkar
+        "tokens_saved": baseline_tokens - used_tokens
+    }
+    logger.info(
+        "Context: %(candidates)d aday, %(duplicates)d tekrar, %(selected)d parça seçildi, "
+        "%(context_tokens)d token (eski yöntem %(baseline_tokens)d, %(tokens_saved)d token tasarruf)",
+        stats
+    )
+    return [s["packed"] for s in selected], stats
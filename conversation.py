@@ -0,0 +1,115 @@
+"""Oturum başına sınırlı konuşma belleği: kayan özet + son turlar penceresi"""
+import json
+import logging
+import zlib
+
+from context_packer import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationMemory:
+    """Modele giden geçmişi token bütçesinde, oturum belleğini sınırlı tutar.
+
+    Son `recent_messages` mesaj olduğu gibi saklanır. Pencerenin dışına taşan
+    mesajlar `summarize_every` turda bir toplu olarak özete katılır:
+    summarizer(önceki özet, yeni mesajlar) sadece yeni turları görür, her
+    seferinde tüm konuşmayı yeniden özetlemez. Özetleme başarısız olursa
+    mesajlar sonraki turda tekrar denenir; pencere dışında bekleyenler
+    eşiğin iki katını aşarsa en eskiler özete girmeden arşivlenir. Özete katılan mesajlar ekranda
+    gösterilmek için zlib ile sıkıştırılıp arşivlenir; arşiv de
+    `max_archive_bytes` ile sınırlıdır (en eskiler atılır).
+    """
+
+    def __init__(self, summarizer=None, recent_messages=4, summarize_every=2,
+                 history_token_budget=800, summary_max_tokens=300, max_archive_bytes=256 * 1024):
+        self.summarizer = summarizer
+        self.recent_messages = recent_messages
+        self.summarize_every = summarize_every
+        self.history_token_budget = history_token_budget
+        self.summary_max_tokens = summary_max_tokens
+        self.max_archive_bytes = max_archive_bytes
+        self.summary = ""
+        self.dropped_messages = 0  # Arşiv sınırı yüzünden tamamen silinenler
+        self.unsummarized_messages = 0  # Özet alınamadığı için özete girmeden arşivlenenler
+        self._archive = []
+        self._archive_bytes = 0
+        self._recent = []
+
+    def __len__(self):
+        return self.dropped_messages + len(self._archive) + len(self._recent)
+
+    def add(self, message):
+        self._recent.append(message)
+
+    def latest(self, count):
+        """Son `count` mesaj ve daha eskide kalan (gösterilebilir) mesaj sayısı.
+
+        Arşivden sadece pencereye giren mesajlar açılır; maliyet konuşma
+        uzunluğuna değil `count`'a bağlıdır.
+        """
+        from_recent = self._recent[-count:] if count else []
+        from_archive = min(count - len(from_recent), len(self._archive))
+        archived = [json.loads(zlib.decompress(blob)) for blob in self._archive[len(self._archive) - from_archive:]]
+        hidden = len(self._archive) - from_archive + len(self._recent) - len(from_recent)
+        return archived + from_recent, hidden
+
+    def model_history(self):
+        """Modele gönderilecek geçmiş: özet (varsa) + bütçeye sığan en yeni mesajlar"""
+        budget = self.history_token_budget
+        history = []
+        if self.summary:
+            summary = truncate_to_tokens(self.summary, min(self.summary_max_tokens, budget // 2))
+            history.append({"role": "system", "content": f"Önceki konuşmanın özeti:\n{summary}"})
+            budget -= count_tokens(history[0]["content"])
+
+        recent = []
+        for message in reversed(self._recent):
+            content = message["content"]
+            tokens = count_tokens(content)
+            if tokens > budget:
+                # En son mesaj tek başına bile sığmıyorsa kısaltılmış hali gönderilir
+                if not recent and budget > 0:
+                    recent.append({"role": message["role"], "content": truncate_to_tokens(content, budget)})
+                break
+            recent.append({"role": message["role"], "content": content})
+            budget -= tokens
+        return history + recent[::-1]
+
+    def maybe_summarize(self):
+        """Pencere dışında `summarize_every` tur biriktiyse özete kat; özet güncellendiyse True"""
+        overflow = len(self._recent) - self.recent_messages
+        threshold = 2 * self.summarize_every
+        if overflow < threshold:
+            return False
+
+        folded = self._recent[:overflow]
+        if self.summarizer is not None:
+            try:
+                summary = self.summarizer(self.summary, folded)
+            except Exception:
+                logger.exception("Konuşma özeti güncellenemedi")
+            else:
+                self.summary = truncate_to_tokens(summary.strip(), self.summary_max_tokens)
+                del self._recent[:overflow]
+                for message in folded:
+                    self._archive_message(message)
+                return True
+
+        # Özetlenemeyen mesajlar bir sonraki turda tekrar denenir, ama bekleyenler
+        # eşiğin iki katını aşarsa en eskiler özetsiz arşivlenir (bellek sınırlı kalır)
+        excess = overflow - 2 * threshold
+        if excess > 0:
+            for message in self._recent[:excess]:
+                self._archive_message(message)
+            del self._recent[:excess]
+            self.unsummarized_messages += excess
+        return False
+
+    def _archive_message(self, message):
+        blob = zlib.compress(json.dumps(message, ensure_ascii=False).encode("utf-8"))
+        self._archive.append(blob)
+        self._archive_bytes += len(blob)
+        while self._archive_bytes > self.max_archive_bytes and self._archive:
+            self._archive_bytes -= len(self._archive.pop(0))
+            self.dropped_messages += 1
@@ -0,0 +1,94 @@
+"""Sorgu embedding'lerini istemci tarafında bir kez hesaplayıp paylaşma"""
+import threading
+from collections import OrderedDict
+
+from text_utils import normalize_query
+
+
+class QueryEmbedder:
+    """Normalize edilmiş metne göre LRU önbellekli embedding üretici.
+
+    Aynı soru için önbellek, Weaviate hybrid aramaları ve cevap önbelleği
+    tek bir vektörü paylaşır; böylece her collection araması sunucuda
+    metni yeniden vektörleştirmez.
+    """
+
+    def __init__(self, ai_client, model, max_entries=1024):
+        self.ai_client = ai_client
+        self.model = model
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "api_calls": 0, "errors": 0}
+
+    def embed(self, text):
+        """Metnin vektörünü döndür (hata olursa None)"""
+        key = normalize_query(text)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                return vector
+
+        try:
+            response = self.ai_client.embeddings.create(model=self.model, input=key)
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            return None
+        vector = response.data[0].embedding
+
+        with self._lock:
+            self.stats["api_calls"] += 1
+            self._cache[key] = vector
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return vector
+
+    def embed_many(self, texts):
+        """Birden fazla metni tek API isteğiyle vektörleştir (önbellektekiler istenmez).
+
+        embed()'den farklı olarak hata yutulmaz; toplu işlerde çağıran taraf
+        isteği tekrar deneyebilir.
+        """
+        keys = [normalize_query(text) for text in texts]
+        vectors = {}
+        with self._lock:
+            self.stats["requests"] += len(keys)
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    vectors[key] = self._cache[key]
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+
+        if missing:
+            try:
+                response = self.ai_client.embeddings.create(model=self.model, input=missing)
+            except Exception:
+                with self._lock:
+                    self.stats["errors"] += 1
+                raise
+            with self._lock:
+                self.stats["api_calls"] += 1
+                for key, item in zip(missing, response.data):
+                    vectors[key] = self._cache[key] = item.embedding
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return [vectors[key] for key in keys]
+
+    def record_reuse(self, count=1):
+        """Hazır bir vektörün count kez daha (sunucuda yeniden vektörleştirmek yerine) kullanıldığını kaydet.
+
+        Vektörü üreten embed() isteği ilk kullanımı zaten saydığı için N
+        collection'a dağıtılan bir vektör için count = N - 1 verilir.
+        """
+        with self._lock:
+            self.stats["requests"] += count
+
+    @property
+    def saved_calls(self):
+        """Önbellek ve vektör paylaşımıyla önlenen embedding çağrısı sayısı"""
+        with self._lock:
+            return self.stats["requests"] - self.stats["api_calls"] - self.stats["errors"]
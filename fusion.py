@@ -0,0 +1,48 @@
+"""Farklı collection'lardan gelen sonuçları skor farkındalıklı birleştirme"""
+import statistics
+
+
+def normalize_scores(results):
+    """Hybrid skorlarını verilen tüm sonuçlar üzerinden z-skora çevir.
+
+    Collection'ların hepsi aynı soru ve aynı hybrid füzyonla arandığı için
+    ham skorlar ortak bir havuzda karşılaştırılır; skoru olmayan sonuçlar
+    havuzun en altına konur.
+    """
+    scores = [r["score"] for r in results if r.get("score") is not None]
+    if not scores:
+        return [0.0] * len(results)
+    mean = statistics.fmean(scores)
+    spread = statistics.pstdev(scores) or 1.0
+    floor = (min(scores) - mean) / spread - 1.0
+    return [
+        (r["score"] - mean) / spread if r.get("score") is not None else floor
+        for r in results
+    ]
+
+
+def reciprocal_rank_fusion(results_by_key, k=60):
+    """Collection sıralamalarını ve global skor sıralamasını RRF ile birleştir.
+
+    Her collection'ın kendi sıralaması bir liste, tüm sonuçların ortak
+    havuzda normalize edilmiş skora göre global sıralaması da bir liste
+    sayılır; her sonucun puanı bulunduğu listelerdeki 1 / (k + sıra) toplamıdır.
+    Normalizasyon collection başına yapılsaydı her collection'ın ilk sonucu
+    aynı skoru alır, global sıralama collection sıralarını sırayla dizmekten
+    öteye geçmezdi.
+    """
+    items = []
+    for results in results_by_key.values():
+        for rank, result in enumerate(results):
+            items.append({"result": result, "rank": rank})
+
+    normalized = normalize_scores([item["result"] for item in items])
+    global_order = sorted(range(len(items)), key=lambda i: normalized[i], reverse=True)
+    global_rank = {index: rank for rank, index in enumerate(global_order)}
+
+    fused = []
+    for index, item in enumerate(items):
+        result = dict(item["result"])
+        result["fused_score"] = 1.0 / (k + item["rank"] + 1) + 1.0 / (k + global_rank[index] + 1)
+        fused.append(result)
+    return sorted(fused, key=lambda r: r["fused_score"], reverse=True)
@@ -0,0 +1,307 @@
+"""PDF'leri sayfa sayfa Weaviate collection'larına yükle (paralel ve artımlı)
+
+Her sayfa bir nesnedir (content, filename, page_number); uygulamanın
+beklediği alanlar bunlardır. Sayfa metinleri süreç havuzunda çıkarılır,
+generator'lar üzerinden akar ve dinamik batch ile eklenir.
+
+Yerel manifest her dosyanın boyut/tarih/özetini ve sayfa başına metin
+özetini tutar: değişmemiş dosyalar hiç açılmaz, değişmiş dosyalarda da
+sadece metni değişen sayfalar yeniden yazılır. Nesne UUID'leri
+collection + dosya adı + sayfa numarasından türetildiği için aynı sayfa
+tekrar yazıldığında eskisinin üzerine yazılır. Uygulama kaynakları dosya
+adıyla gösterdiği için manifest de dosya adıyla tutulur; farklı klasörlerde
+aynı adlı iki PDF aynı çalıştırmaya verilirse yükleme hiç başlamaz.
+
+    python ingest.py kira_hukuku belgeler/kira/
+    python ingest.py is_hukuku belgeler/is/*.pdf --workers 8 --prune
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import weaviate.classes as wvc
+from weaviate.util import generate_uuid5
+
+from categories import COLLECTION_MAP
+from pipeline import EMBEDDING_MODEL
+from settings import connect_weaviate, load_secrets
+
+MANIFEST_PATH = "ingest_manifest.json"
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+
+
+# --- MANİFEST ---
+def load_manifest(path, force=False):
+    """Manifest'i oku; force ile farklı sürümlü manifest yerine boş manifest döner"""
+    if not os.path.exists(path):
+        return {"version": MANIFEST_VERSION, "collections": {}}
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        if force:
+            return {"version": MANIFEST_VERSION, "collections": {}}
+        raise RuntimeError(f"{path} farklı bir sürümle yazılmış, --force ile yeniden yükleyin")
+    return manifest
+
+
+def save_manifest(manifest, path):
+    """Yarıda kesilen yazma manifest'i bozmasın diye geçici dosya + rename"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def page_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def page_uuid(collection_name, filename, page_number):
+    return generate_uuid5(f"{collection_name}/{filename}/{page_number}")
+
+
+# --- GENERATOR HATTI ---
+def iter_pdf_files(paths):
+    """Verilen dosya ve klasörlerdeki PDF'ler (klasörler özyinelemeli)"""
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+        elif path.suffix.lower() == ".pdf" and path.exists():
+            yield path
+        else:
+            print(f"⚠️ Atlandı (PDF değil ya da yok): {raw}", file=sys.stderr)
+
+
+def check_unique_names(files):
+    """Aynı adlı PDF'ler birbirinin sayfalarını ve manifest kaydını ezmesin diye baştan reddedilir"""
+    by_name = {}
+    for path in files:
+        by_name.setdefault(path.name, []).append(path)
+    duplicates = {name: paths for name, paths in by_name.items() if len(paths) > 1}
+    if duplicates:
+        listing = "\n".join(f"  {name}: {', '.join(map(str, paths))}" for name, paths in sorted(duplicates.items()))
+        raise ValueError(f"Aynı adlı PDF'ler var, yeniden adlandırın ya da ayrı kategorilere yükleyin:\n{listing}")
+
+
+def iter_changed_files(files, entries, stats, force=False):
+    """Manifest'e göre değişmiş olabilecek dosyalar: (yol, stat bilgisi, dosya özeti)
+
+    Boyut ve değişiklik zamanı aynıysa dosya okunmaz bile; sadece tarihi
+    değişmişse içerik özeti karşılaştırılır.
+    """
+    for path in files:
+        stats["files"] += 1
+        st = path.stat()
+        entry = entries.get(path.name)
+        if not force and entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+            stats["files_unchanged"] += 1
+            continue
+        digest = file_digest(path)
+        if not force and entry and entry["sha256"] == digest:
+            entry["mtime"] = st.st_mtime_ns
+            stats["files_unchanged"] += 1
+            continue
+        yield path, st, digest
+
+
+def extract_pages(path):
+    """Süreç havuzunda çalışır: sayfa metinlerinin listesi (hata varsa mesajı)"""
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(path)
+        return [(page.extract_text() or "").strip() for page in reader.pages], None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def iter_extracted(changed, executor, max_in_flight):
+    """Sayfa çıkarımını havuza gönder; sırayı koruyarak, sınırlı sayıda dosyayı bellekte tut"""
+    pending = []
+    for item in changed:
+        pending.append((item, executor.submit(extract_pages, str(item[0]))))
+        if len(pending) >= max_in_flight:
+            item, future = pending.pop(0)
+            yield (*item, *future.result())
+    for item, future in pending:
+        yield (*item, *future.result())
+
+
+def iter_page_objects(extracted, collection_name, entries, stats, completed, force=False):
+    """Metni değişen sayfalar için eklenecek nesneler; silinecek UUID'ler stats'e yazılır
+
+    force ile sayfa özetleri karşılaştırılmaz, her sayfa yeniden yazılır; eski
+    özetler yalnızca artık olmayan sayfaları silmek için kullanılır.
+    """
+    for path, st, digest, pages, error in extracted:
+        if error:
+            stats["files_failed"] += 1
+            print(f"❌ {path.name}: {error}", file=sys.stderr)
+            continue
+
+        old_pages = (entries.get(path.name) or {}).get("pages", {})
+        new_pages = {}
+        if path.name not in entries:
+            # Manifest dışında yüklenmiş eski kayıtlar (rastgele UUID'li) tekrar oluşmasın
+            stats["stale_files"].append(path.name)
+
+        for page_number, text in enumerate(pages, start=1):
+            stats["pages_extracted"] += 1
+            if not text:
+                stats["pages_empty"] += 1
+                continue
+            digest_ = page_digest(text)
+            new_pages[str(page_number)] = digest_
+            if not force and old_pages.get(str(page_number)) == digest_:
+                stats["pages_unchanged"] += 1
+                continue
+            yield path.name, {
+                "uuid": page_uuid(collection_name, path.name, page_number),
+                "properties": {"content": text, "filename": path.name, "page_number": page_number},
+            }
+
+        for page_number in old_pages.keys() - new_pages.keys():
+            stats["deleted_uuids"].append(page_uuid(collection_name, path.name, int(page_number)))
+
+        completed[path.name] = {
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns,
+            "sha256": digest,
+            "pages": new_pages,
+        }
+        stats["files_changed"] += 1
+
+
+# --- WEAVIATE ---
+def ensure_collection(client, collection_name):
+    """Collection yoksa uygulamanın beklediği şemayla oluştur"""
+    if client.collections.exists(collection_name):
+        return client.collections.get(collection_name)
+    print(f"🆕 {collection_name} oluşturuluyor")
+    return client.collections.create(
+        collection_name,
+        vectorizer_config=wvc.config.Configure.Vectorizer.text2vec_openai(model=EMBEDDING_MODEL),
+        properties=[
+            wvc.config.Property(name="content", data_type=wvc.config.DataType.TEXT),
+            wvc.config.Property(name="filename", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+            wvc.config.Property(name="page_number", data_type=wvc.config.DataType.INT, skip_vectorization=True),
+        ]
+    )
+
+
+def delete_by_filename(collection, filenames):
+    for filename in filenames:
+        collection.data.delete_many(where=wvc.query.Filter.by_property("filename").equal(filename))
+
+
+def ingest(client, category_key, paths, manifest, workers=None, max_in_flight=None, force=False, prune=False):
+    """Tek kategorinin PDF'lerini yükle; manifest yerinde güncellenir, istatistikler döner"""
+    files = list(iter_pdf_files(paths))
+    check_unique_names(files)
+    collection_name = COLLECTION_MAP[category_key]["collection"]
+    collection = ensure_collection(client, collection_name)
+    entries = manifest["collections"].setdefault(collection_name, {})
+
+    stats = {
+        "files": 0, "files_unchanged": 0, "files_changed": 0, "files_failed": 0,
+        "pages_extracted": 0, "pages_unchanged": 0, "pages_empty": 0,
+        "pages_written": 0, "pages_failed": 0, "pages_deleted": 0,
+        "stale_files": [], "deleted_uuids": [],
+    }
+    completed = {}
+    uuid_to_file = {}
+    workers = workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        changed = iter_changed_files(files, entries, stats, force=force)
+        extracted = iter_extracted(changed, executor, max_in_flight or workers * 2)
+        objects = iter_page_objects(extracted, collection_name, entries, stats, completed, force=force)
+
+        with collection.batch.dynamic() as batch:
+            for filename, obj in objects:
+                if stats["stale_files"]:
+                    delete_by_filename(collection, stats["stale_files"])
+                    stats["stale_files"].clear()
+                uuid_to_file[str(obj["uuid"])] = filename
+                batch.add_object(properties=obj["properties"], uuid=obj["uuid"])
+                stats["pages_written"] += 1
+    # Sadece sayfası olmayan yeni dosyalar da eski kayıtlarını bırakmasın
+    delete_by_filename(collection, stats.pop("stale_files"))
+
+    # Başarısız nesnesi olan dosyalar manifest'e yazılmaz, bir sonraki çalıştırmada tekrar denenir
+    failed_files = set()
+    for failed in collection.batch.failed_objects:
+        failed_files.add(uuid_to_file.get(str(failed.original_uuid)))
+        stats["pages_failed"] += 1
+    for filename, entry in completed.items():
+        if filename not in failed_files:
+            entries[filename] = entry
+
+    deleted_uuids = stats.pop("deleted_uuids")
+    for uuid in deleted_uuids:
+        collection.data.delete_by_id(uuid)
+    stats["pages_deleted"] = len(deleted_uuids)
+
+    if prune:
+        present = {path.name for path in files}
+        removed = [filename for filename in entries if filename not in present]
+        delete_by_filename(collection, removed)
+        for filename in removed:
+            stats["pages_deleted"] += len(entries.pop(filename)["pages"])
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF'leri Weaviate collection'larına sayfa sayfa yükle")
+    parser.add_argument("category", choices=sorted(COLLECTION_MAP), help="Hedef kategori (collection'ı belirler)")
+    parser.add_argument("paths", nargs="+", help="PDF dosyaları ya da klasörler")
+    parser.add_argument("--workers", type=int, help="Sayfa çıkarımı için süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--force", action="store_true", help="Manifest'i yok say, tüm sayfaları yeniden yaz")
+    parser.add_argument("--prune", action="store_true", help="Verilen yollarda artık olmayan dosyaları collection'dan sil")
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest, force=args.force)
+    client = connect_weaviate(load_secrets())
+    try:
+        stats = ingest(client, args.category, args.paths, manifest,
+                       workers=args.workers, force=args.force, prune=args.prune)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    finally:
+        client.close()
+        save_manifest(manifest, args.manifest)
+
+    seconds = stats["seconds"]
+    print(
+        f"📄 {stats['files']} dosya: {stats['files_unchanged']} değişmemiş, {stats['files_changed']} işlendi, "
+        f"{stats['files_failed']} okunamadı\n"
+        f"📑 {stats['pages_extracted']} sayfa okundu ({stats['pages_extracted'] / seconds:.1f} sayfa/sn), "
+        f"{stats['pages_written']} yazıldı, {stats['pages_unchanged']} aynı, {stats['pages_empty']} boş, "
+        f"{stats['pages_deleted']} silindi, {stats['pages_failed']} hatalı\n"
+        f"⏱️ {seconds:.1f} sn"
+    )
+    if stats["pages_failed"] or stats["files_failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Cevaptaki kanun ve madde atıflarını tespit edip link oluşturma"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from text_utils import turkish_lower
+
+REGISTRY_PATH = Path(__file__).parent / "law_registry.json"
+
+# Kanun adından sonra gelebilecek ekler: "TBK'nın", "6098 sayılı Kanun'un", "(TBK)"
+_LAW_TAIL = r"(?:['’]\w+)?(?:\s+sayılı)?(?:\s+kanun\w*(?:['’]\w+)?)?(?:\s*\([^)\n]{1,20}\))?\s*,?\s*"
+# "Madde 299", "md. 17", "m. 17" ya da "299. maddesi"
+_ARTICLE = r"(?:(?:madde\w*|md|m)\.?\s*(?P<article>\d+)|(?P<article_ord>\d+)\s*\.?\s*madde)"
+
+
+def _trie_pattern(words):
+    """Kelimeleri ortak önekleri paylaşan tek bir regex'e çevir.
+
+    Düz "a|b|c" alternasyonunda regex motoru her konumda tüm alternatifleri
+    sırayla dener; trie biçiminde ise ilk karakterden sonra sadece ilgili dal
+    denenir, böylece kayıt büyüdükçe tarama süresi neredeyse sabit kalır.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def render(node):
+        alternatives = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and "" not in node:
+            return alternatives[0]
+        body = "(?:" + "|".join(alternatives) + ")"
+        return body + "?" if "" in node else body
+
+    return render(trie)
+
+
+def article_url(law, article):
+    """Sayfayı doğrudan ilgili maddeye kaydıran link (tarayıcı metin parçası)"""
+    return f"{law['url']}#:~:text=MADDE%20{article}%2D"
+
+
+class LawRegistry:
+    """Kanun kaydını tek bir derlenmiş regex ile tarayan çıkarıcı"""
+
+    def __init__(self, laws):
+        self.laws = {law["key"]: law for law in laws}
+        self._alias_to_key = {}
+        for law in laws:
+            for alias in law["aliases"]:
+                self._alias_to_key[turkish_lower(alias)] = law["key"]
+
+        # Rakamla biten takma ad (6098) başka bir rakamla devam edemez,
+        # harfle biten ad ise ek alabilir ("medeni kanun" → "medeni kanunu")
+        self._pattern = re.compile(
+            rf"(?<!\w)(?P<law>{_trie_pattern(self._alias_to_key)})"
+            rf"(?:(?<=\d)(?!\d)|(?<=[^\W\d])\w*)"
+            rf"{_LAW_TAIL}{_ARTICLE}?"
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["laws"])
+
+    @property
+    def max_match_length(self):
+        """Tek bir atıfın kaplayabileceği en uzun metin (akış tamponu için)"""
+        return max(map(len, self._alias_to_key)) + 96
+
+    def finditer(self, lowered_text, pos=0):
+        """turkish_lower() uygulanmış metindeki atıf eşleşmeleri (`pos`'tan itibaren)"""
+        return self._pattern.finditer(lowered_text, pos)
+
+    def collect(self, match, found):
+        """Eşleşmeyi sonuçlara ekle; yeni kanun veya madde eklendiyse True"""
+        key = self._alias_to_key[match.group("law")]
+        law = self.laws[key]
+        changed = False
+        if key not in found:
+            found[key] = {
+                "key": key,
+                "name": law["name"],
+                "url": law["url"],
+                "pdf": law["pdf"],
+                "articles": []
+            }
+            changed = True
+        article = match.group("article") or match.group("article_ord")
+        if article and article not in [a["number"] for a in found[key]["articles"]]:
+            found[key]["articles"].append({"number": article, "url": article_url(law, article)})
+            changed = True
+        return changed
+
+    def extract(self, text):
+        """Metinde geçen kanunları (ve varsa madde numaralarını) bul"""
+        found = {}
+        for match in self.finditer(turkish_lower(text)):
+            self.collect(match, found)
+        return list(found.values())
+
+
+class IncrementalLawExtractor:
+    """Stream sırasında parça parça beslenen kanun atıfı çıkarıcı.
+
+    Tamponun sonundaki `carry` karakter henüz tamamlanmamış bir atıf
+    olabileceği için ("TBK Mad" → "TBK Madde 299") bir sonraki parçaya
+    bırakılır; onun öncesi bir kez taranıp atılır. Böylece stream bittiğinde
+    sadece küçük bir kuyruk taranır.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or get_default_registry()
+        self.carry = self.registry.max_match_length
+        self._buffer = ""
+        self._pos = 0
+        self._found = {}
+
+    @property
+    def links(self):
+        return list(self._found.values())
+
+    def _scan(self, final):
+        limit = len(self._buffer) if final else len(self._buffer) - self.carry
+        changed = False
+        next_pos = max(self._pos, limit)
+        for match in self.registry.finditer(self._buffer, self._pos):
+            if match.end() > limit and not final:
+                # Atıf devam ediyor olabilir, bir sonraki parçada yeniden dene
+                next_pos = match.start()
+                break
+            changed |= self.registry.collect(match, self._found)
+            next_pos = max(match.end(), limit)
+        # Kelime sınırı kontrolü için bir karakter geride bırak
+        cut = max(next_pos - 1, 0)
+        self._buffer = self._buffer[cut:]
+        self._pos = next_pos - cut
+        return changed
+
+    def feed(self, chunk):
+        """Yeni parçayı işle; yeni kanun veya madde bulunduysa True"""
+        if not chunk:
+            return False
+        self._buffer += turkish_lower(chunk)
+        # En az `carry` kadar yeni metin birikmeden tarama yapma; her karakter
+        # en fazla iki kez taranır
+        if len(self._buffer) - self._pos <= 2 * self.carry:
+            return False
+        return self._scan(final=False)
+
+    def finish(self):
+        """Kalan kuyruğu tara; yeni kanun veya madde bulunduysa True (sonuçlar `links`'te)"""
+        return self._scan(final=True)
+
+
+@lru_cache(maxsize=1)
+def get_default_registry():
+    """Varsayılan kayıt (law_registry.json) süreç başına bir kez derlenir"""
+    return LawRegistry.from_file(REGISTRY_PATH)
+
+
+def extract_law_links(response_text, registry=None):
+    """Cevaptaki kanun maddelerini tespit et ve link oluştur"""
+    return (registry or get_default_registry()).extract(response_text)
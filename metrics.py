@@ -0,0 +1,193 @@
+"""Süreç içi gecikme histogramları ve Prometheus metin formatında dışa aktarım"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def escape_label_value(value):
+    """Etiket değerinde \\, " ve satır sonu kaçışlanır (exposition format)"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def escape_help(text):
+    """HELP satırında sadece \\ ve satır sonu kaçışlanır"""
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+class Histogram:
+    """Prometheus tarzı kümülatif kovalı histogram"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Son kova +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Kovalar içinde doğrusal enterpolasyonla yaklaşık yüzdelik"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= target:
+                return lower + (bound - lower) * (target - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Adı + etiketlerine göre histogram ve sayaç tutan, thread-safe kayıt"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._buckets = {}
+        self._histograms = {}
+        self._counters = {}
+
+    def describe(self, name, help_text, buckets=None):
+        """Metriğe açıklama (ve histogram ise özel kovalar) tanımla"""
+        self._help[name] = help_text
+        if buckets is not None:
+            self._buckets[name] = buckets
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self._buckets.get(name, DEFAULT_BUCKETS))
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Blok süresini saniye cinsinden histogram'a yaz"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def summary(self, name, quantiles=(0.5, 0.95, 0.99)):
+        """Tek metriğin etiket kombinasyonu başına sayı ve yüzdelikleri"""
+        with self._lock:
+            rows = []
+            for (metric, labels), histogram in sorted(self._histograms.items()):
+                if metric != name:
+                    continue
+                row = dict(labels)
+                row["count"] = histogram.count
+                for q in quantiles:
+                    row[f"p{int(q * 100)}"] = histogram.quantile(q)
+                rows.append(row)
+            return rows
+
+    def render_prometheus(self):
+        """Prometheus metin formatı (exposition format 0.0.4)"""
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{escape_label_value(v)}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            by_name = {}
+            for (name, labels), histogram in self._histograms.items():
+                by_name.setdefault(name, []).append((labels, histogram))
+            for name in sorted(by_name):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {escape_help(self._help[name])}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(by_name[name]):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{fmt_labels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_bucket{fmt_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{name}_sum{fmt_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{fmt_labels(labels)} {histogram.count}")
+
+            counters = {}
+            for (name, labels), value in self._counters.items():
+                counters.setdefault(name, []).append((labels, value))
+            for name in sorted(counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {escape_help(self._help[name])}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(counters[name]):
+                    lines.append(f"{name}{fmt_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path):
+        """Metrikleri dosyaya yaz (node_exporter textfile collector için atomik)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+
+def start_http_server(registry, port, host="127.0.0.1"):
+    """/metrics uç noktasını arka plan thread'inde sun"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# Süreç genelinde tek kayıt; Streamlit oturumları ve arka plan thread'leri paylaşır
+REGISTRY = MetricsRegistry()
+
+REGISTRY.describe("hukuk_stage_seconds", "Soru-cevap hattındaki aşamaların süresi (saniye)")
+REGISTRY.describe("hukuk_collection_query_seconds", "Tek collection hybrid sorgusunun süresi (saniye)")
+REGISTRY.describe(
+    "hukuk_llm_tokens_per_second",
+    "İlk token sonrası LLM akış hızı (parça/saniye)",
+    buckets=(5, 10, 20, 30, 40, 60, 80, 100, 150, 200)
+)
+REGISTRY.describe("hukuk_search_failures_total", "Başarısız collection aramaları")
+REGISTRY.describe("hukuk_single_flight_total", "Yeni başlatılan (leader) ve devam edene katılan (follower) istekler")
+REGISTRY.describe("hukuk_llm_prompt_tokens_total", "Cevap isteklerinin model bazında prompt token'ları (cached: sağlayıcı önbelleğinden)")
+REGISTRY.describe("hukuk_tier_decisions_total", "Model kademesi kararları (tier, neden)")
+REGISTRY.describe("hukuk_tier_seconds", "Kademe başına ilk token ve toplam cevap süresi (saniye)")
+REGISTRY.describe("hukuk_llm_cost_usd_total", "Kademe başına tahmini LLM maliyeti (USD; estimated: kesilen akış, yerel token sayımı)")
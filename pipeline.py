@@ -0,0 +1,473 @@
+"""Streamlit'ten bağımsız soru-cevap hattı
+
+routing → paralel arama → context hazırlama → LLM stream adımları burada,
+arayüzden ayrı durur; böylece app.py dışında (benchmark, toplu işlem vb.)
+aynı hat Weaviate/OpenAI istemcileri verilerek kullanılabilir.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from categories import COLLECTION_MAP
+from centroid_router import CentroidRouter
+from context_packer import count_tokens, pack_context
+from embeddings import QueryEmbedder
+from fusion import reciprocal_rank_fusion
+from metrics import REGISTRY as metrics
+from resilience import CircuitBreakerBoard, run_with_deadlines
+from retrievers import LocalHybridRetriever, WeaviateRetriever
+from router import KeywordRouter
+from tiering import DRAFT_RESET, TierPolicy, TierTelemetry, estimate_cost, speculative_deltas
+
+logger = logging.getLogger(__name__)
+
+# --- SORGU EMBEDDING'İ ---
+# Collection'ların text2vec-openai vektörleştiricisiyle aynı model olmalı,
+# aksi halde istemcide üretilen vektör sunucudaki vektörlerle karşılaştırılamaz.
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_CACHE_MAX_ENTRIES = 1024
+
+# --- ROUTİNG ---
+ROUTING_TOP_K = 2  # Skorlar yakınsa aranacak en fazla kategori sayısı
+ROUTING_TIE_RATIO = 0.75  # En iyi skorun bu oranına ulaşan kategoriler de aranır
+
+# Keyword bulunamazsa embedding'e en yakın kategori merkezleri kullanılır
+# (centroid_router.py ile üretilir; dosya yoksa eski davranış: tüm kategoriler)
+CENTROIDS_PATH = "centroids.npz"
+CENTROID_MIN_SIMILARITY = 0.3  # Bunun altında router'a güvenilmez
+CENTROID_MARGIN = 0.03  # En iyi skora bu kadar yakın kategoriler de aranır
+
+# --- PARALEL ARAMA ---
+SEARCH_MAX_WORKERS = 16  # Tüm oturumlar için eş zamanlı Weaviate sorgusu sınırı
+SEARCH_TIMEOUT_SECONDS = 4.0  # COLLECTION_MAP'te "timeout" ile collection bazında değiştirilebilir
+SEARCH_HEDGE_AFTER_SECONDS = 1.5  # Bu sürede cevap gelmezse yedek istek (None: kapalı)
+SEARCH_TOTAL_CANDIDATES = 6  # Tüm collection'lardan toplam aday sayısı
+SEARCH_MIN_LIMIT = 2  # Collection başına en az aday
+SEARCH_RETURN_PROPERTIES = ["content", "filename", "page_number"]  # Sadece kullanılan alanlar
+SEARCH_ALPHA = 0.5  # Hybrid skorunda vektör araması ağırlığı (0: sadece BM25, 1: sadece vektör)
+# "local" ise Weaviate yerine LOCAL_INDEX_PATH'teki indeks kullanılır (bkz. retrievers.py)
+RETRIEVAL_BACKEND = os.environ.get("RETRIEVAL_BACKEND", "weaviate")
+LOCAL_INDEX_PATH = os.environ.get("LOCAL_INDEX_PATH", "local_index")
+BREAKER_FAILURE_THRESHOLD = 3  # Art arda bu kadar hatadan sonra collection atlanır
+BREAKER_RESET_SECONDS = 30.0
+
+# --- CONTEXT ---
+# Prompt'a giren belge parçalarının toplam token sınırı; None: eski yöntemin
+# (kategori başına 2 parça × 600 karakter) aynı sonuçlarla harcayacağı token
+CONTEXT_TOKEN_BUDGET = None
+CONTEXT_CHUNK_MAX_TOKENS = 150  # Tek parça en fazla (cümle sınırında kısaltılır; eski 600 karakter kadar)
+CONTEXT_DUPLICATE_THRESHOLD = 0.8  # Bu Jaccard benzerliğinin üstündeki parçalar tekrar sayılır
+CONTEXT_MMR_LAMBDA = 0.7  # 1'e yaklaştıkça alaka, 0'a yaklaştıkça çeşitlilik ağır basar
+
+# --- LLM ---
+ANSWER_MODEL = "gpt-4o"
+ANSWER_TEMPERATURE = 0.4
+# Sağlayıcı önbelleği aynı sunucuya yönlensin diye tüm cevap istekleri aynı anahtarı taşır;
+# önbellek en az 1024 token'lık ortak önekte devreye girer
+PROMPT_CACHE_KEY = "hukuk-answer-v1"
+PROMPT_CACHE_MIN_TOKENS = 1024
+# --- MODEL KADEMELERİ ---
+# Keyword routing'in emin olduğu kısa, tek kategorili sorular hızlı modele gider
+TIER_FAST_MODEL = "gpt-4o-mini"
+TIER_MIN_KEYWORD_SCORE = 2  # Eşleşen keyword'lerin kelime sayısı toplamı
+TIER_MAX_SECOND_RATIO = 0.5  # İkinci kategori skoru bunun üstündeyse soru belirsiz sayılır
+TIER_MAX_QUERY_WORDS = 16
+# "1" ise güçlü modele giden sorularda o başlayana kadar hızlı modelin taslağı gösterilir
+SPECULATIVE_DRAFTS = os.environ.get("SPECULATIVE_DRAFTS") == "1"
+TIER_LOG_PATH = os.environ.get("TIER_LOG_PATH")  # Her kararın JSONL kaydı (eşik ayarı için)
+
+SUMMARY_MODEL = "gpt-4o-mini"  # Konuşma özeti için ucuz model
+SUMMARY_MAX_TOKENS = 300
+
+
+def load_centroid_router(path=CENTROIDS_PATH):
+    """Merkez vektör dosyası varsa yükle, yoksa None"""
+    if not os.path.exists(path):
+        return None
+    return CentroidRouter.load(path, min_similarity=CENTROID_MIN_SIMILARITY, margin=CENTROID_MARGIN)
+
+
+def make_retriever(weaviate_client, backend=RETRIEVAL_BACKEND, local_index_path=LOCAL_INDEX_PATH):
+    """Ayarlı arama arka ucu"""
+    if backend == "local":
+        return LocalHybridRetriever(local_index_path, alpha=SEARCH_ALPHA)
+    if backend != "weaviate":
+        raise ValueError(f"Bilinmeyen arama arka ucu: {backend}")
+    return WeaviateRetriever(weaviate_client, return_properties=SEARCH_RETURN_PROPERTIES, alpha=SEARCH_ALPHA)
+
+
+# Cevap isteklerinin değişmeyen başı; categories bölümü compile_answer_prefix ile eklenir
+ANSWER_INSTRUCTIONS = """Sen kıdemli bir hukuk müşavirisin.
+
+GÖREVİN 2 AŞAMALI:
+
+1. ADIM - KATEGORİ TESPİTİ:
+Kullanıcının sorusunu analiz et ve hangi kategoriye ait olduğunu belirle.
+Mevcut kategoriler en altta KATEGORİLER bölümünde listelenmiştir.
+
+2. ADIM - CEVAP OLUŞTURMA:
+Belirlediğin kategorideki belgelerden yararlanarak soruyu yanıtla.
+
+KURALLAR:
+- Cevabın robotik olmasın, avukat gibi akıcı anlat
+- Önemli kısımları **kalın** yaz
+- Açıklama içinde kanun maddelerine atıfta bulun (örn: "TBK Madde 299'a göre...")
+- Belirlediğin kategoriyi cevabında belirtme (otomatik gösteriyoruz)
+
+ÇOK ÖNEMLİ FORMAT:
+Cevabını şu şekilde yapılandır:
+
+[Ana açıklama burada - akıcı bir şekilde, kanun maddelerine atıflar yaparak]
+
+Örneğin: "Kiracı olarak **TBK Madde 299**'da belirtilen haklara sahipsiniz. Bu maddeye göre..."
+
+---
+
+**📜 İlgili Kanun Maddeleri:**
+- [SADECE yukarıdaki açıklamada bahsettiğin maddeleri buraya tekrar listele]
+- [YENİ madde ekleme, sadece yukarıda kullandıklarını yaz]
+- [Her maddeyi ayrı satırda yaz, örn: "Türk Borçlar Kanunu Madde 299"]
+- [Eğer hiç kanun maddesi kullanmadıysan bu bölümü boş bırak]
+
+ÇOK ÖNEMLİ: Soruya en uygun kategorideki belgeleri kullan. Diğer kategorilerdeki belgeleri görmezden gel."""
+
+
+def compile_answer_prefix(collection_map):
+    """Sabit sistem mesajı: talimatlar + kategoriler (anahtar sırasıyla, her süreçte aynı bayt dizisi)"""
+    categories = "\n".join(
+        f"- {collection_map[key]['emoji']} {key}: {collection_map[key]['name']}" for key in sorted(collection_map)
+    )
+    return f"{ANSWER_INSTRUCTIONS}\n\nKATEGORİLER:\n{categories}"
+
+
+def stream_deltas(ai_response, on_usage=None):
+    """OpenAI stream'inden sadece metin parçalarını üret (son parçadaki kullanım bilgisi on_usage'a)"""
+    for chunk in ai_response:
+        if on_usage is not None and getattr(chunk, "usage", None):
+            on_usage(chunk.usage)
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+class Pipeline:
+    """Tüm oturumların paylaştığı arama + cevap hattı.
+
+    weaviate_client ve ai_client dışarıdan verilir; gerçek istemciler yerine
+    aynı arayüzü sunan sahte istemciler de kullanılabilir (bkz. benchmarks/fakes.py).
+    """
+
+    def __init__(self, weaviate_client, ai_client, collection_map=COLLECTION_MAP, centroid_router=None, executor=None, retriever=None):
+        self.client = weaviate_client
+        self.retriever = retriever or make_retriever(weaviate_client)
+        self.ai_client = ai_client
+        self.collection_map = collection_map
+        self.query_embedder = QueryEmbedder(ai_client, EMBEDDING_MODEL, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+        # Keyword otomatı hat kurulurken bir kez derlenir
+        self.keyword_router = KeywordRouter(collection_map)
+        self.centroid_router = centroid_router
+        self.executor = executor or ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="weaviate-search")
+        # Her istekte aynı kalan önek bir kez derlenir
+        self.category_order = sorted(collection_map)
+        self.answer_prefix = compile_answer_prefix(collection_map)
+        # Model başına; spekülatif modda taslak ve asıl cevap ayrı modellerden gelir
+        self.prompt_cache_stats = {}
+        prefix_tokens = count_tokens(self.answer_prefix)
+        if prefix_tokens < PROMPT_CACHE_MIN_TOKENS:
+            logger.info(
+                "Sabit önek %d token; önbellek ancak geçmişle birlikte %d token aşılınca devreye girer",
+                prefix_tokens, PROMPT_CACHE_MIN_TOKENS
+            )
+        self._usage_lock = threading.Lock()
+        self.tier_policy = TierPolicy(
+            TIER_FAST_MODEL,
+            ANSWER_MODEL,
+            min_keyword_score=TIER_MIN_KEYWORD_SCORE,
+            max_second_ratio=TIER_MAX_SECOND_RATIO,
+            max_query_words=TIER_MAX_QUERY_WORDS,
+            speculative=SPECULATIVE_DRAFTS
+        )
+        self.tier_telemetry = TierTelemetry(TIER_LOG_PATH)
+        self.circuit_breakers = CircuitBreakerBoard(
+            failure_threshold=BREAKER_FAILURE_THRESHOLD,
+            reset_after=BREAKER_RESET_SECONDS
+        )
+
+    # --- HIZLI KEYWORD ROUTİNG ---
+    def classify_query_fast(self, query):
+        """Keyword tabanlı hızlı routing (tek geçişte en yüksek skorlu kategori)"""
+        return self.keyword_router.classify(query)
+
+    def route(self, query):
+        """Aranacak kategorileri belirle.
+
+        Önce keyword router, eşleşme yoksa embedding merkezleri denenir;
+        ikisi de emin değilse tüm kategorilerde aranır.
+        """
+        with metrics.time("hukuk_stage_seconds", stage="keyword_routing"):
+            ranked = self.keyword_router.top_categories(query, k=ROUTING_TOP_K, tie_ratio=ROUTING_TIE_RATIO)
+        with metrics.time("hukuk_stage_seconds", stage="embedding"):
+            query_embedding = self.query_embedder.embed(query)
+
+        embedding_routed = False
+        if not ranked and self.centroid_router is not None and query_embedding is not None:
+            with metrics.time("hukuk_stage_seconds", stage="centroid_routing"):
+                ranked = self.centroid_router.route(query_embedding)[:ROUTING_TOP_K]
+            embedding_routed = bool(ranked)
+
+        return {
+            "detected_category": ranked[0] if len(ranked) == 1 else None,
+            "ranked_categories": ranked,
+            "categories_to_search": ranked or list(self.collection_map.keys()),
+            "embedding_routed": embedding_routed,
+            "query_embedding": query_embedding
+        }
+
+    # --- PARALEL ARAMA ---
+    def search_single_collection(self, collection_name, query, limit, vector=None):
+        """Tek collection'da ara (hatalar çağırana iletilir)"""
+        start = time.perf_counter()
+        try:
+            results = self.retriever.search(collection_name, query, limit, vector)
+        except Exception:
+            metrics.observe("hukuk_collection_query_seconds", time.perf_counter() - start, collection=collection_name, outcome="error")
+            raise
+        metrics.observe("hukuk_collection_query_seconds", time.perf_counter() - start, collection=collection_name, outcome="ok")
+        return results
+
+    def search_parallel(self, query, category_keys, vector=None):
+        """Paralel arama; (skora göre birleştirilmiş sonuçlar, yanıt vermeyen kategoriler) döndürür"""
+
+        # Soru bir kez vektörleştirilir, tüm collection'lar aynı vektörü kullanır
+        if vector is None:
+            vector = self.query_embedder.embed(query)
+        if vector is not None:
+            # Vektörün kendisi ilk aramanın isteği sayılır; kalan collection'lar
+            # (hedge tekrarları hariç) aynı metni tekrar vektörleştirmez
+            self.query_embedder.record_reuse(len(category_keys) - 1)
+
+        # Toplam aday sayısı sabit, collection sayısı arttıkça her birinden daha az iste
+        limit = max(SEARCH_MIN_LIMIT, math.ceil(SEARCH_TOTAL_CANDIDATES / len(category_keys)))
+        calls, timeouts, breakers = {}, {}, {}
+        for key in category_keys:
+            info = self.collection_map[key]
+            calls[key] = partial(self.search_single_collection, info["collection"], query, limit, vector)
+            timeouts[key] = info.get("timeout", SEARCH_TIMEOUT_SECONDS)
+            breakers[key] = self.circuit_breakers.get(info["collection"])
+
+        with metrics.time("hukuk_stage_seconds", stage="retrieval"):
+            hits_by_key, failures = run_with_deadlines(
+                self.executor,
+                calls,
+                timeouts,
+                hedge_after=SEARCH_HEDGE_AFTER_SECONDS,
+                breakers=breakers
+            )
+        for key, reason in failures.items():
+            metrics.inc("hukuk_search_failures_total", collection=self.collection_map[key]["collection"], reason=reason)
+
+        results_by_key = {}
+        for key, hits in hits_by_key.items():
+            info = self.collection_map[key]
+            results_by_key[key] = [
+                dict(hit, category=info["name"], category_key=key, emoji=info["emoji"])
+                for hit in hits
+            ]
+
+        return reciprocal_rank_fusion(results_by_key), failures
+
+    # --- CONTEXT ---
+    def build_context(self, all_results):
+        """Token bütçesine göre en değerli, birbirini tekrar etmeyen parçalar"""
+        with metrics.time("hukuk_stage_seconds", stage="context"):
+            return pack_context(
+                all_results,
+                token_budget=CONTEXT_TOKEN_BUDGET,
+                chunk_max_tokens=CONTEXT_CHUNK_MAX_TOKENS,
+                duplicate_threshold=CONTEXT_DUPLICATE_THRESHOLD,
+                mmr_lambda=CONTEXT_MMR_LAMBDA
+            )
+
+    # --- MODEL KADEMESİ ---
+    def choose_tier(self, query, route):
+        """route() sonucuna ve keyword skorlarına göre cevap modelini seç"""
+        return self.tier_policy.decide(query, route, self.keyword_router.scores(query))
+
+    # --- TEK LLM ÇAĞRISI İLE ROUTİNG + CEVAP ---
+    def build_answer_messages(self, query, all_results, history):
+        """Cevap isteğinin mesajları.
+
+        Mesaj sırası önbellek dostu: sabit önek (talimatlar + kategoriler),
+        geçmiş, en sonda da bu soruya özel belgeler ve soru.
+        """
+
+        # Belgeler kategori sırası sabit olacak şekilde gruplanır
+        contexts_by_category = {}
+        for result in all_results:
+            contexts_by_category.setdefault(result["category_key"], []).append(result)
+
+        context_parts = []
+        for cat_key in self.category_order:
+            if cat_key not in contexts_by_category:
+                continue
+            info = self.collection_map[cat_key]
+            context_parts.append(f"=== {info['emoji']} {info['name'].upper()} KATEGORİSİ ===\n")
+            for r in contexts_by_category[cat_key]:  # Parçalar pack_context ile token bütçesine göre seçilmiş ve kısaltılmış
+                context_parts.append(f"[KAYNAK: {r['filename']} S.{r['page']}]\n{r['content']}\n\n")
+
+        # Chat history (ConversationMemory.model_history: özet + token bütçesine sığan son mesajlar)
+        messages = [{"role": "system", "content": self.answer_prefix}]
+        for m in history:
+            messages.append({"role": m["role"], "content": m["content"]})
+
+        messages.append({
+            "role": "user",
+            "content": f"{''.join(context_parts)}SORU: {query}"
+        })
+        return messages
+
+    def get_answer_with_smart_routing(self, query, all_results, history, model=ANSWER_MODEL):
+        """Tek LLM çağrısında hem kategori tespit hem cevap"""
+        return self.ai_client.chat.completions.create(
+            model=model,
+            messages=self.build_answer_messages(query, all_results, history),
+            temperature=ANSWER_TEMPERATURE,
+            stream=True,
+            stream_options={"include_usage": True},
+            prompt_cache_key=PROMPT_CACHE_KEY
+        )
+
+    def record_usage(self, usage, model=ANSWER_MODEL):
+        """API'nin bildirdiği prompt ve önbellekten gelen prompt token sayılarını model bazında kaydet"""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        metrics.inc("hukuk_llm_prompt_tokens_total", usage.prompt_tokens - cached, model=model, cached="false")
+        metrics.inc("hukuk_llm_prompt_tokens_total", cached, model=model, cached="true")
+        with self._usage_lock:
+            stats = self.prompt_cache_stats.setdefault(model, {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0})
+            stats["requests"] += 1
+            stats["prompt_tokens"] += usage.prompt_tokens
+            stats["cached_tokens"] += cached
+
+    def prompt_cache_snapshot(self):
+        """prompt_cache_stats'ın kopyası (model → sayaçlar), başka thread'ler yazarken de okunabilir"""
+        with self._usage_lock:
+            return {model: dict(stats) for model, stats in self.prompt_cache_stats.items()}
+
+    def summarize_conversation(self, summary, messages):
+        """Önceki özeti yeni mesajlarla güncelle (sadece yeni turlar gönderilir)"""
+        transcript = "\n".join(
+            f"{'Kullanıcı' if m['role'] == 'user' else 'Danışman'}: {m['content']}" for m in messages
+        )
+        response = self.ai_client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": (
+                    "Bir hukuk danışmanlığı konuşmasının özetini güncelliyorsun. Önceki özeti yeni "
+                    "mesajlarla birleştir; kullanıcının durumunu, sorduğu konuları, verilen cevapların "
+                    "özünü ve bahsedilen kanun maddelerini koru. Kısa ve maddeler halinde yaz."
+                )},
+                {"role": "user", "content": f"ÖNCEKİ ÖZET:\n{summary or '(yok)'}\n\nYENİ MESAJLAR:\n{transcript}"}
+            ],
+            temperature=0,
+            max_tokens=SUMMARY_MAX_TOKENS
+        )
+        return response.choices[0].message.content or summary
+
+    def _model_deltas(self, query, all_results, history, model, usage):
+        """Tek modelin cevap akışı; API'nin bildirdiği token sayıları usage'a yazılır"""
+        def on_usage(api_usage):
+            self.record_usage(api_usage, model)
+            details = getattr(api_usage, "prompt_tokens_details", None)
+            usage.update(
+                prompt_tokens=api_usage.prompt_tokens,
+                cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+                completion_tokens=getattr(api_usage, "completion_tokens", 0) or 0
+            )
+
+        ai_response = self.get_answer_with_smart_routing(query, all_results, history, model=model)
+        streamed = []
+        try:
+            for delta in stream_deltas(ai_response, on_usage):
+                streamed.append(delta)
+                yield delta
+        finally:
+            # Yarıda bırakılan akışta (ör. asıl cevap başlayınca kesilen taslak)
+            # HTTP yanıtı da kapatılır; yoksa model üretmeye ve faturalamaya devam eder
+            close = getattr(ai_response, "close", None)
+            if close is not None:
+                close()
+            if not usage:
+                # Kesilen akışın kullanım bilgisi gelmez: prompt ve gelen parçalar yerelde sayılır
+                prompt_tokens = sum(
+                    count_tokens(m["content"]) for m in self.build_answer_messages(query, all_results, history)
+                )
+                usage.update(
+                    prompt_tokens=prompt_tokens,
+                    cached_tokens=0,
+                    completion_tokens=count_tokens("".join(streamed)),
+                    estimated=True
+                )
+
+    def stream_answer(self, query, all_results, history, tier=None):
+        """Cevabı metin parçaları olarak üret; ilk token süresini, akış hızını ve maliyeti ölç.
+
+        tier choose_tier() kararıdır (verilmezse güçlü model). Spekülatif
+        kararda akışta DRAFT_RESET işareti olabilir: önceki parçalar taslaktır.
+        """
+        tier = tier or {"tier": "strong", "model": ANSWER_MODEL, "reason": "default", "speculative": False}
+        start = time.perf_counter()
+        usages = {tier["model"]: {}}
+        final = self._model_deltas(query, all_results, history, tier["model"], usages[tier["model"]])
+        if tier["speculative"]:
+            usages.setdefault(self.tier_policy.fast_model, {})
+            draft = self._model_deltas(query, all_results, history, self.tier_policy.fast_model, usages[self.tier_policy.fast_model])
+            deltas = speculative_deltas(draft, final)
+        else:
+            deltas = final
+
+        first_token_at = None
+        draft_reset_at = None
+        count = 0
+        for delta in deltas:
+            if delta is DRAFT_RESET:
+                draft_reset_at = time.perf_counter()
+            else:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    metrics.observe("hukuk_stage_seconds", first_token_at - start, stage="llm_first_token")
+                count += 1
+            yield delta
+
+        end = time.perf_counter()
+        metrics.observe("hukuk_stage_seconds", end - start, stage="llm_total")
+        if first_token_at is not None and end > first_token_at:
+            metrics.observe("hukuk_llm_tokens_per_second", count / (end - first_token_at))
+
+        # Yarıda kesilen akışların (çoğunlukla taslak) maliyeti yerel token sayımıyla tahmin edilir
+        cost = 0.0
+        for model, usage in usages.items():
+            if not usage:
+                continue
+            model_cost = estimate_cost(model, usage["prompt_tokens"], usage["cached_tokens"], usage["completion_tokens"])
+            metrics.inc(
+                "hukuk_llm_cost_usd_total", model_cost,
+                tier=tier["tier"], estimated="true" if usage.get("estimated") else "false"
+            )
+            cost += model_cost
+        metrics.inc("hukuk_tier_decisions_total", tier=tier["tier"], reason=tier["reason"])
+        if first_token_at is not None:
+            metrics.observe("hukuk_tier_seconds", first_token_at - start, tier=tier["tier"], phase="first_token")
+        metrics.observe("hukuk_tier_seconds", end - start, tier=tier["tier"], phase="total")
+        self.tier_telemetry.record(
+            tier,
+            first_token_seconds=None if first_token_at is None else round(first_token_at - start, 4),
+            final_start_seconds=None if draft_reset_at is None else round(draft_reset_at - start, 4),
+            total_seconds=round(end - start, 4),
+            usage=usages,
+            cost_usd=round(cost, 6),
+            cost_estimated=any(usage.get("estimated") for usage in usages.values())
+        )
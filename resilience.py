@@ -0,0 +1,145 @@
+"""Paralel çağrılar için süre sınırı, hedging ve devre kesici (circuit breaker)"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class CircuitBreaker:
+    """Art arda hata veren bir servisi bir süre devre dışı bırakır.
+
+    `failure_threshold` ardışık hatadan sonra devre açılır ve `reset_after`
+    saniye boyunca çağrılara izin verilmez. Süre dolunca tek bir deneme
+    çağrısına izin verilir (yarı açık); başarılı olursa devre kapanır.
+    """
+
+    def __init__(self, failure_threshold=3, reset_after=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self):
+        """Çağrı yapılabilir mi?"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and self.clock() - self._opened_at >= self.reset_after:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+            self._probing = False
+
+
+class CircuitBreakerBoard:
+    """İsme göre paylaşılan devre kesiciler"""
+
+    def __init__(self, **breaker_kwargs):
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(**self._breaker_kwargs)
+            return self._breakers[name]
+
+
+def run_with_deadlines(executor, calls, timeouts, hedge_after=None, breakers=None):
+    """Çağrıları paylaşılan executor'da paralel çalıştır.
+
+    calls: {anahtar: argümansız fonksiyon}
+    timeouts: {anahtar: saniye} - her çağrının kendi süre sınırı
+    hedge_after: bu kadar saniyede cevap gelmezse aynı çağrı bir kez daha
+        gönderilir, hangisi önce biterse o kullanılır (None: kapalı)
+    breakers: {anahtar: CircuitBreaker} - açık devreli çağrılar hiç yapılmaz
+
+    Dönüş: (sonuçlar, hatalar) - hatalar {anahtar: "timeout" | "circuit_open" | hata adı}
+    """
+    breakers = breakers or {}
+    results, failures = {}, {}
+    start = time.monotonic()
+
+    owners = {}
+    attempts = {}
+    for key, call in calls.items():
+        breaker = breakers.get(key)
+        if breaker is not None and not breaker.allow():
+            failures[key] = "circuit_open"
+            continue
+        future = executor.submit(call)
+        owners[future] = key
+        attempts[key] = [future]
+
+    def finish(key, error=None):
+        for future in attempts.pop(key):
+            future.cancel()
+            owners.pop(future, None)
+        breaker = breakers.get(key)
+        if error is None:
+            if breaker is not None:
+                breaker.record_success()
+        else:
+            failures[key] = error
+            if breaker is not None:
+                breaker.record_failure()
+
+    while attempts:
+        now = time.monotonic()
+
+        # Süresi dolan çağrılar
+        for key in [k for k in attempts if now - start >= timeouts[k]]:
+            finish(key, "timeout")
+
+        # Yavaş kalan çağrılar için yedek istek
+        if hedge_after is not None and now - start >= hedge_after:
+            for key, futures in attempts.items():
+                if len(futures) == 1:
+                    future = executor.submit(calls[key])
+                    owners[future] = key
+                    futures.append(future)
+
+        if not attempts:
+            break
+
+        events = [start + timeouts[k] for k in attempts]
+        if hedge_after is not None and any(len(f) == 1 for f in attempts.values()):
+            events.append(start + hedge_after)
+        wait_for = max(0.0, min(events) - time.monotonic())
+        done, _ = wait(list(owners), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            key = owners.get(future)
+            if key is None or key not in attempts:
+                continue
+            error = future.exception()
+            if error is None:
+                results[key] = future.result()
+                finish(key)
+            elif all(f.done() for f in attempts[key]):
+                # Hedge edilmiş isteklerin hepsi hata verdiyse çağrı başarısız
+                finish(key, type(error).__name__)
+            else:
+                owners.pop(future, None)
+
+    return results, failures
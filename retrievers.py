@@ -0,0 +1,259 @@
+"""Collection araması için değiştirilebilir arka uçlar
+
+search_parallel sadece Retriever arayüzünü bilir:
+    search(collection_name, query, limit, vector=None) → [{content, filename, page, score}, ...]
+
+WeaviateRetriever mevcut Weaviate Cloud hybrid aramasıdır. LocalHybridRetriever
+aynı collection'ların diske yazılmış kopyasında (BM25 ters indeksi + float32
+embedding matrisi, hepsi memory-map) ağ olmadan arar; skorlar Weaviate'in
+hybrid varsayılanı gibi min-max normalize edilip alpha ile karıştırılır.
+
+Yerel indeksi Weaviate'teki collection'lardan üretmek için:
+    python retrievers.py --output local_index
+"""
+import argparse
+import json
+import math
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import weaviate.classes as wvc
+
+from categories import COLLECTION_MAP
+from centroid_router import normalize_rows, object_vector
+from settings import connect_weaviate, load_secrets
+from text_utils import fold_turkish
+
+BM25_K1 = 1.2  # Weaviate varsayılanları
+BM25_B = 0.75
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """BM25 terimleri: küçük harf, noktalama yok, Türkçe karakterler katlanmış"""
+    return _TOKEN_RE.findall(fold_turkish(text))
+
+
+def _min_max(scores):
+    low, high = scores.min(), scores.max()
+    if high == low:
+        return np.ones_like(scores) if high > 0 else np.zeros_like(scores)
+    return (scores - low) / (high - low)
+
+
+class Retriever(ABC):
+    """Arama arka uçlarının ortak arayüzü"""
+
+    @abstractmethod
+    def search(self, collection_name, query, limit, vector=None):
+        """En alakalı sayfalar, skora göre azalan sırada"""
+
+
+class WeaviateRetriever(Retriever):
+    """Weaviate hybrid araması (BM25 + vektör, sunucu tarafında)"""
+
+    def __init__(self, client, return_properties=("content", "filename", "page_number"), alpha=0.5):
+        self.client = client
+        self.return_properties = list(return_properties)
+        self.alpha = alpha
+
+    def search(self, collection_name, query, limit, vector=None):
+        response = self.client.collections.get(collection_name).query.hybrid(
+            query=query,
+            vector=vector,
+            limit=limit,
+            alpha=self.alpha,
+            return_properties=self.return_properties,
+            return_metadata=wvc.query.MetadataQuery(score=True)
+        )
+        return [{
+            "content": obj.properties["content"],
+            "filename": obj.properties["filename"],
+            "page": obj.properties["page_number"],
+            "score": obj.metadata.score
+        } for obj in response.objects]
+
+
+# --- YEREL İNDEKS ---
+def write_local_index(path, documents, vectors=None):
+    """Tek collection'ın indeksini klasöre yaz.
+
+    documents: [{content, filename, page}], vectors: aynı sırada embedding'ler (yoksa sadece BM25)
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    # Metinler tek blokta, ofset tablosuyla (ihtiyaç olan sayfa okunur)
+    encoded = [doc["content"].encode("utf-8") for doc in documents]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(blob) for blob in encoded])
+    with open(path / "texts.bin", "wb") as f:
+        for blob in encoded:
+            f.write(blob)
+    np.save(path / "text_offsets.npy", offsets)
+
+    # BM25 ters indeksi CSR biçiminde: terim → (belge, frekans) listesi
+    postings = {}
+    doc_lengths = np.zeros(len(documents), dtype=np.float32)
+    for doc_id, doc in enumerate(documents):
+        terms = tokenize(doc["content"])
+        doc_lengths[doc_id] = len(terms)
+        for term, tf in Counter(terms).items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    vocabulary = sorted(postings)
+    indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(postings[term]) for term in vocabulary])
+    doc_ids = np.fromiter((d for term in vocabulary for d, _ in postings[term]), dtype=np.int32, count=indptr[-1])
+    tfs = np.fromiter((tf for term in vocabulary for _, tf in postings[term]), dtype=np.float32, count=indptr[-1])
+    np.save(path / "postings_indptr.npy", indptr)
+    np.save(path / "postings_docs.npy", doc_ids)
+    np.save(path / "postings_tf.npy", tfs)
+    np.save(path / "doc_lengths.npy", doc_lengths)
+
+    if vectors is not None and len(vectors):
+        np.save(path / "embeddings.npy", normalize_rows(np.asarray(vectors, dtype=np.float32)))
+
+    with open(path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "vocabulary": vocabulary,
+            "filenames": [doc["filename"] for doc in documents],
+            "pages": [doc["page"] for doc in documents]
+        }, f, ensure_ascii=False)
+
+
+class _LocalCollection:
+    """Diskteki tek collection indeksi; diziler memory-map olarak açılır"""
+
+    def __init__(self, path):
+        path = Path(path)
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.term_ids = {term: i for i, term in enumerate(meta["vocabulary"])}
+        self.filenames = meta["filenames"]
+        self.pages = meta["pages"]
+
+        self.texts = np.memmap(path / "texts.bin", dtype=np.uint8, mode="r") if os.path.getsize(path / "texts.bin") else b""
+        self.text_offsets = np.load(path / "text_offsets.npy", mmap_mode="r")
+        self.indptr = np.load(path / "postings_indptr.npy", mmap_mode="r")
+        self.doc_ids = np.load(path / "postings_docs.npy", mmap_mode="r")
+        self.tfs = np.load(path / "postings_tf.npy", mmap_mode="r")
+        self.doc_lengths = np.load(path / "doc_lengths.npy", mmap_mode="r")
+        embeddings_path = path / "embeddings.npy"
+        self.embeddings = np.load(embeddings_path, mmap_mode="r") if embeddings_path.exists() else None
+
+        self.size = len(self.filenames)
+        self.avg_length = float(np.mean(self.doc_lengths)) if self.size else 0.0
+        # BM25 uzunluk normalizasyonu sorgudan bağımsız, bir kez hesaplanır
+        self.length_norm = BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(self.doc_lengths) / max(self.avg_length, 1e-9))
+
+    def bm25(self, query):
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term, query_tf in Counter(tokenize(query)).items():
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end]
+            idf = math.log(1 + (self.size - (end - start) + 0.5) / ((end - start) + 0.5))
+            # Bir terimin posting listesinde her belge bir kez geçer, doğrudan toplanabilir
+            scores[docs] += query_tf * idf * tf * (BM25_K1 + 1) / (tf + self.length_norm[docs])
+        return scores
+
+    def content(self, doc_id):
+        start, end = self.text_offsets[doc_id], self.text_offsets[doc_id + 1]
+        return bytes(self.texts[start:end]).decode("utf-8")
+
+
+class LocalHybridRetriever(Retriever):
+    """Yerel BM25 + vektör hybrid araması; collection'lar ilk aramada yüklenir"""
+
+    def __init__(self, index_path, alpha=0.5):
+        self.index_path = Path(index_path)
+        self.alpha = alpha
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def _collection(self, collection_name):
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(collection_name)
+                if collection is None:
+                    path = self.index_path / collection_name
+                    if not (path / "meta.json").exists():
+                        raise FileNotFoundError(f"{collection_name} için yerel indeks yok: {path}")
+                    collection = self._collections[collection_name] = _LocalCollection(path)
+        return collection
+
+    def search(self, collection_name, query, limit, vector=None):
+        collection = self._collection(collection_name)
+        if not collection.size:
+            return []
+
+        keyword_scores = collection.bm25(query)
+        if vector is not None and collection.embeddings is not None:
+            # Çağıranın (ve QueryEmbedder önbelleğinin) dizisi yerinde değiştirilmez
+            query_vector = np.asarray(vector, dtype=np.float32)
+            query_vector = query_vector / (np.linalg.norm(query_vector) or 1.0)
+            vector_scores = collection.embeddings @ query_vector
+            scores = self.alpha * _min_max(vector_scores) + (1 - self.alpha) * _min_max(keyword_scores)
+        else:
+            scores = keyword_scores
+            if not scores.any():
+                return []
+
+        limit = min(limit, collection.size)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [{
+            "content": collection.content(doc_id),
+            "filename": collection.filenames[doc_id],
+            "page": collection.pages[doc_id],
+            "score": float(scores[doc_id])
+        } for doc_id in top]
+
+
+def export_collection(client, collection_name, output_path):
+    """Weaviate collection'ını (metin + vektör) yerel indekse yaz"""
+    documents, vectors = [], []
+    collection = client.collections.get(collection_name)
+    for obj in collection.iterator(include_vector=True, return_properties=["content", "filename", "page_number"]):
+        documents.append({
+            "content": obj.properties["content"] or "",
+            "filename": obj.properties["filename"],
+            "page": obj.properties["page_number"]
+        })
+        vectors.append(object_vector(obj))
+
+    # Vektörü eksik nesne varsa vektör araması bu collection için kapatılır
+    if any(vector is None for vector in vectors):
+        print(f"⚠️ {collection_name}: bazı nesnelerin vektörü yok, sadece BM25 kullanılacak")
+        vectors = None
+    write_local_index(Path(output_path) / collection_name, documents, vectors)
+    return len(documents)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weaviate collection'larından yerel arama indeksi üret")
+    parser.add_argument("--output", default="local_index")
+    args = parser.parse_args()
+
+    client = connect_weaviate(load_secrets())
+    try:
+        for info in COLLECTION_MAP.values():
+            count = export_collection(client, info["collection"], args.output)
+            print(f"✅ {info['collection']}: {count} sayfa")
+    finally:
+        client.close()
+    print(f"💾 Yerel indeks: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
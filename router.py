@@ -0,0 +1,112 @@
+"""Aho-Corasick tabanlı tek geçişli keyword routing"""
+from collections import deque
+
+from text_utils import fold_turkish
+
+# Sert ünsüz yumuşaması: "tazminat" → "tazminatı" ama "kitap" → "kitabı"
+_SOFTENING = {"p": "b", "t": "d", "k": "g"}
+
+
+class AhoCorasick:
+    """Tüm desenleri tek otomatta toplayan çoklu desen arayıcı"""
+
+    def __init__(self, patterns):
+        """patterns: (metin, değer) çiftleri"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for text, value in patterns:
+            state = 0
+            for ch in text:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(text), value))
+
+        # Fail linklerini BFS ile kur
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """Metindeki tüm eşleşmeleri (başlangıç, değer) olarak üret"""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, value in self._out[state]:
+                yield i - length + 1, value
+
+
+class KeywordRouter:
+    """COLLECTION_MAP keyword'lerini bir kez derleyip kategori skorları üreten router.
+
+    Keyword'ler kelime başında eşleşmek zorundadır ama sonrasında ek
+    alabilir ("kiracı" → "kiracının"), böylece Türkçe çekimli formlar da
+    yakalanır. Çok kelimeli keyword'ler daha belirleyici olduğu için
+    kelime sayısı kadar ağırlık alır.
+    """
+
+    def __init__(self, collection_map):
+        self._keywords = []
+        patterns = []
+        for category, info in collection_map.items():
+            for keyword in info["keywords"]:
+                folded = fold_turkish(keyword)
+                if not folded:
+                    continue
+                keyword_id = len(self._keywords)
+                self._keywords.append((category, len(folded.split())))
+                for variant in self._variants(folded):
+                    patterns.append((variant, keyword_id))
+        self._automaton = AhoCorasick(patterns)
+
+    @staticmethod
+    def _variants(keyword):
+        variants = {keyword}
+        if len(keyword) >= 4 and keyword[-1] in _SOFTENING:
+            variants.add(keyword[:-1] + _SOFTENING[keyword[-1]])
+        return variants
+
+    def scores(self, query):
+        """Eşleşen her kategori için ağırlıklı skor"""
+        text = fold_turkish(query)
+        matched = set()
+        for start, keyword_id in self._automaton.iter_matches(text):
+            if start == 0 or text[start - 1] == " ":
+                matched.add(keyword_id)
+
+        scores = {}
+        for keyword_id in matched:
+            category, weight = self._keywords[keyword_id]
+            scores[category] = scores.get(category, 0) + weight
+        return scores
+
+    def top_categories(self, query, k=2, tie_ratio=0.75):
+        """En iyi kategori ve ona yakın skorlu olanlar (en fazla k tane)"""
+        ranked = sorted(self.scores(query).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return []
+        best = ranked[0][1]
+        return [category for category, score in ranked[:k] if score >= best * tie_ratio]
+
+    def classify(self, query):
+        """En yüksek skorlu kategori (hiç eşleşme yoksa None)"""
+        scores = self.scores(query)
+        if not scores:
+            return None
+        return max(scores, key=scores.get)
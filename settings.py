@@ -0,0 +1,35 @@
+"""Streamlit dışında çalışan betikler için bağlantı ayarları"""
+import os
+import tomllib
+from pathlib import Path
+
+import weaviate
+
+SECRETS_PATH = Path(__file__).parent / ".streamlit" / "secrets.toml"
+
+SECRET_KEYS = ("WEAVIATE_URL", "WEAVIATE_API_KEY", "OPENAI_API_KEY")
+
+
+def load_secrets(path=SECRETS_PATH):
+    """Ortam değişkenlerini, yoksa .streamlit/secrets.toml dosyasını oku"""
+    secrets = {}
+    if Path(path).exists():
+        with open(path, "rb") as f:
+            secrets.update(tomllib.load(f))
+    for key in SECRET_KEYS:
+        if os.environ.get(key):
+            secrets[key] = os.environ[key]
+
+    missing = [key for key in SECRET_KEYS if not secrets.get(key)]
+    if missing:
+        raise RuntimeError(f"Eksik ayar(lar): {', '.join(missing)}")
+    return secrets
+
+
+def connect_weaviate(secrets):
+    """app.py ile aynı ayarlarla Weaviate Cloud bağlantısı"""
+    return weaviate.connect_to_weaviate_cloud(
+        cluster_url=secrets["WEAVIATE_URL"],
+        auth_credentials=weaviate.auth.AuthApiKey(secrets["WEAVIATE_API_KEY"]),
+        headers={"X-OpenAI-Api-Key": secrets["OPENAI_API_KEY"]}
+    )
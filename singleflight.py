@@ -0,0 +1,100 @@
+"""Aynı anda sorulan aynı soruları tek arama + tek LLM akışında birleştirme"""
+import threading
+
+
+class Flight:
+    """Tek bir üretimin sonucu ve token akışı; istediği kadar oturum dinleyebilir.
+
+    Üretici önce set_result() ile arama sonuçlarını, sonra emit() ile cevap
+    parçalarını yayınlar ve close() ile bitirir. Dinleyiciler result() ile
+    sonuçları bekler, stream() ile o ana kadarki ve sonraki parçaları alır.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._result = None
+        self._has_result = False
+        self._deltas = []
+        self._done = False
+        self._error = None
+        self.subscribers = 1
+
+    def set_result(self, result):
+        with self._condition:
+            self._result = result
+            self._has_result = True
+            self._condition.notify_all()
+
+    def emit(self, delta):
+        with self._condition:
+            self._deltas.append(delta)
+            self._condition.notify_all()
+
+    def close(self, error=None):
+        with self._condition:
+            self._error = error
+            self._done = True
+            self._condition.notify_all()
+
+    def result(self):
+        """set_result() çağrılana kadar bekle (üretici hata verdiyse hatayı yükselt)"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._has_result or self._done)
+            if not self._has_result and self._error is not None:
+                raise self._error
+            return self._result
+
+    def stream(self):
+        """Parçaları baştan itibaren, üretici bitene kadar üret"""
+        index = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._deltas) > index or self._done)
+                pending = self._deltas[index:]
+                done = self._done
+                error = self._error
+            index += len(pending)
+            yield from pending
+            if done and not pending:
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    """Anahtar başına en fazla bir üretim çalıştırır, aynı anahtarla gelenler ona katılır.
+
+    Üretim ayrı bir thread'de koşar; böylece ilk soran oturum kapansa veya
+    Streamlit script'i yarıda kesilse de bekleyen diğer oturumlar cevabı alır.
+    Üretim bittiğinde anahtar serbest kalır, sonraki istek yeni üretim başlatır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.stats = {"flights": 0, "joined": 0}
+
+    def do(self, key, producer):
+        """(flight, ilk_istek_mi) döndürür; producer(flight) sadece ilk istekte çalışır"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.subscribers += 1
+                self.stats["joined"] += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self.stats["flights"] += 1
+
+        def run():
+            error = None
+            try:
+                producer(flight)
+            except Exception as e:
+                error = e
+            finally:
+                with self._lock:
+                    self._flights.pop(key, None)
+                flight.close(error)
+
+        threading.Thread(target=run, name="single-flight", daemon=True).start()
+        return flight, True
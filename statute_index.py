@@ -0,0 +1,152 @@
+"""Kanun maddelerinin yerel indeksi (ağ olmadan madde önizlemesi)
+
+law_registry.json'daki kanunların PDF'lerinden bir kez üretilir: tüm madde
+metinleri tek bir UTF-8 blokta, (kanun, madde no) → (başlangıç, bitiş) bayt
+ofsetleri de yoğun bir tabloda tutulur. İkisi de memory-map ile açıldığı için
+bir maddenin metni tek tablo okuması ve bir dilimle (O(1)) bulunur.
+
+    python statute_index.py --pdf-dir kanunlar/ --download   # PDF'ler yoksa mevzuat.gov.tr'den indir
+    python statute_index.py --pdf-dir kanunlar/ --output statute_index
+"""
+import argparse
+import json
+import re
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+from law_links import REGISTRY_PATH
+
+STATUTE_INDEX_PATH = "statute_index"
+
+# Satır başındaki madde başlığı: "MADDE 299-", "Madde 1 –", "MADDE 17.-"
+# "Ek Madde", "Geçici Madde" ve "MADDE 6/A" önceki maddeyi bitirir ama indekslenmez
+_ARTICLE_HEADING_RE = re.compile(
+    r"^[ \t]*(?P<prefix>(?:ek|ge[çÇ][iİıI]c[iİıI])[ \t]+)?madde[ \t]+(?P<number>\d+)(?P<suffix>[ \t]*/[ \t]*\w+)?"
+    r"[ \t]*\.?[ \t]*[-–—]",
+    re.IGNORECASE | re.MULTILINE
+)
+_PARAGRAPH_RE = re.compile(r"\s*(\(\d+\))")
+
+
+def _clean_article(text):
+    """PDF satır kırılımlarını birleştir, fıkraları ((1), (2) ...) ayrı satıra al"""
+    text = " ".join(text.split())
+    return _PARAGRAPH_RE.sub(r"\n\1", text).strip()
+
+
+def split_articles(text):
+    """Kanun metnini {madde no: metin} sözlüğüne ayır (aynı numaranın ilk geçtiği yer alınır)"""
+    headings = list(_ARTICLE_HEADING_RE.finditer(text))
+    articles = {}
+    for heading, following in zip(headings, headings[1:] + [None]):
+        number = int(heading.group("number"))
+        if heading.group("prefix") or heading.group("suffix") or number in articles:
+            continue
+        end = following.start() if following else len(text)
+        articles[number] = _clean_article(text[heading.start():end])
+    return articles
+
+
+def read_pdf_text(path):
+    from pypdf import PdfReader
+
+    return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+
+
+def download_pdf(law, path):
+    request = urllib.request.Request(law["pdf"], headers={"User-Agent": "Mozilla/5.0"})
+    with urllib.request.urlopen(request, timeout=60) as response, open(path, "wb") as f:
+        f.write(response.read())
+
+
+def build_index(laws, pdf_dir, output, download=False):
+    """Her kanunun PDF'inden ({numara}.pdf) maddeleri çıkar ve indeksi yaz"""
+    pdf_dir, output = Path(pdf_dir), Path(output)
+    pdf_dir.mkdir(parents=True, exist_ok=True)
+    output.mkdir(parents=True, exist_ok=True)
+
+    articles_by_law = {}
+    for law in laws:
+        pdf_path = pdf_dir / f"{law['number']}.pdf"
+        if not pdf_path.exists():
+            if not download:
+                print(f"⚠️ {pdf_path} yok, {law['key']} atlanıyor (--download ile indirilebilir)")
+                continue
+            print(f"⬇️ {law['name']} indiriliyor")
+            download_pdf(law, pdf_path)
+        articles_by_law[law["key"]] = split_articles(read_pdf_text(pdf_path))
+        print(f"✅ {law['key']}: {len(articles_by_law[law['key']])} madde")
+
+    law_keys = list(articles_by_law)
+    max_article = max((max(articles, default=0) for articles in articles_by_law.values()), default=0)
+    # [kanun, madde] → (başlangıç, bitiş); bulunmayan maddeler (0, 0)
+    offsets = np.zeros((len(law_keys), max_article + 1, 2), dtype=np.int64)
+    position = 0
+    with open(output / "articles.bin", "wb") as f:
+        for law_id, key in enumerate(law_keys):
+            for number, text in sorted(articles_by_law[key].items()):
+                blob = text.encode("utf-8")
+                f.write(blob)
+                offsets[law_id, number] = (position, position + len(blob))
+                position += len(blob)
+    np.save(output / "article_offsets.npy", offsets)
+
+    with open(output / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"laws": law_keys}, f)
+    return {key: len(articles) for key, articles in articles_by_law.items()}
+
+
+class StatuteIndex:
+    """(kanun anahtarı, madde no) → madde metni; dosyalar memory-map ile açılır"""
+
+    def __init__(self, path):
+        path = Path(path)
+        with open(path / "meta.json", encoding="utf-8") as f:
+            self.law_ids = {key: i for i, key in enumerate(json.load(f)["laws"])}
+        self.offsets = np.load(path / "article_offsets.npy", mmap_mode="r")
+        text_path = path / "articles.bin"
+        self.text = np.memmap(text_path, dtype=np.uint8, mode="r") if text_path.stat().st_size else b""
+
+    @classmethod
+    def load(cls, path=STATUTE_INDEX_PATH):
+        """İndeks üretilmişse yükle, yoksa None"""
+        if not (Path(path) / "meta.json").exists():
+            return None
+        return cls(path)
+
+    def article(self, law_key, number):
+        """Maddenin tam metni (indekste yoksa None)"""
+        law_id = self.law_ids.get(law_key)
+        number = int(number)
+        if law_id is None or not 0 <= number < self.offsets.shape[1]:
+            return None
+        start, end = self.offsets[law_id, number]
+        if start == end:
+            return None
+        return bytes(self.text[start:end]).decode("utf-8")
+
+    def preview(self, law_key, number, max_chars=600):
+        """Cevap yanında gösterilecek kısaltılmış madde metni"""
+        text = self.article(law_key, number)
+        if text is None or len(text) <= max_chars:
+            return text
+        return text[:max_chars].rsplit(" ", 1)[0] + " …"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kanun PDF'lerinden madde indeksi üret")
+    parser.add_argument("--pdf-dir", default="kanunlar", help="{kanun numarası}.pdf dosyalarının klasörü")
+    parser.add_argument("--output", default=STATUTE_INDEX_PATH)
+    parser.add_argument("--download", action="store_true", help="Eksik PDF'leri mevzuat.gov.tr'den indir")
+    args = parser.parse_args()
+
+    with open(REGISTRY_PATH, encoding="utf-8") as f:
+        laws = json.load(f)["laws"]
+    counts = build_index(laws, args.pdf_dir, args.output, download=args.download)
+    print(f"💾 {sum(counts.values())} madde indekslendi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Streaming cevabın placeholder'a kısılmış (throttled) şekilde yazılması"""
+import threading
+import time
+
+
+class ThrottledRenderer:
+    """Token parçalarını biriktirip placeholder'ı seyrek günceller.
+
+    Her markdown() çağrısı büyüyen metnin tamamını yeniden gönderdiği için
+    her token'da yazmak cevap uzunluğunda karesel maliyet demektir. Burada
+    yazma sadece son yazmadan beri `min_interval` saniye geçtiyse veya
+    `min_chars` karakter biriktiyse yapılır; kuyruk finish() ile her zaman yazılır.
+    """
+
+    def __init__(self, placeholder, min_interval=0.1, min_chars=80, cursor="▌", clock=time.monotonic):
+        self.placeholder = placeholder
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self.cursor = cursor
+        self.clock = clock
+        self._parts = []
+        self._pending_chars = 0
+        self._last_flush = clock()
+        self.stats = {"deltas": 0, "renders": 0, "bytes_pushed": 0}
+
+    @property
+    def text(self):
+        # Birleştirilmiş metni tek parça olarak sakla, sonraki join sadece yeni parçaları ekler
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def _render(self, text):
+        self.placeholder.markdown(text)
+        self.stats["renders"] += 1
+        self.stats["bytes_pushed"] += len(text.encode("utf-8"))
+
+    def feed(self, delta):
+        """Yeni parçayı ekle, politika izin veriyorsa ekrana yaz"""
+        if not delta:
+            return
+        self._parts.append(delta)
+        self._pending_chars += len(delta)
+        self.stats["deltas"] += 1
+
+        now = self.clock()
+        if self._pending_chars >= self.min_chars or now - self._last_flush >= self.min_interval:
+            self._render(self.text + self.cursor)
+            self._pending_chars = 0
+            self._last_flush = now
+
+    def reset(self):
+        """Gösterilen metni sil (spekülatif taslak yerine asıl cevap başlarken)"""
+        self._parts = []
+        self._pending_chars = 0
+        self._render(self.cursor)
+        self._last_flush = self.clock()
+
+    def finish(self):
+        """Kalan kuyruğu imleçsiz yaz ve tam metni döndür"""
+        text = self.text
+        self._render(text)
+        self._pending_chars = 0
+        return text
+
+
+class RenderStats:
+    """Oturumlar arası toplam render sayaçları (flush politikasını ayarlamak için)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {
+            "answers": 0, "deltas": 0, "renders": 0, "bytes_pushed": 0,
+            "answers_with_links": 0, "first_link_seconds": 0.0
+        }
+
+    def record(self, stats):
+        with self._lock:
+            self.totals["answers"] += 1
+            for key in ("deltas", "renders", "bytes_pushed"):
+                self.totals[key] += stats[key]
+
+    def record_first_link(self, seconds):
+        """Stream başından ilk kanun linkinin gösterilmesine kadar geçen süre"""
+        with self._lock:
+            self.totals["answers_with_links"] += 1
+            self.totals["first_link_seconds"] += seconds
+
+    def mean_first_link(self):
+        with self._lock:
+            count = self.totals["answers_with_links"]
+            return self.totals["first_link_seconds"] / count if count else 0.0
+
+    def per_answer(self, key):
+        with self._lock:
+            answers = self.totals["answers"]
+            return self.totals[key] / answers if answers else 0.0
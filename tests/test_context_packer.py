@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from context_packer import baseline_context_tokens, count_tokens, pack_context, truncate_to_tokens
+
+WORDS = "kiracı kiraya veren tahliye bedel sözleşme madde hüküm süre ihtar dava işçi kıdem".split()
+
+
+def random_page(rng, sentences):
+    return " ".join(" ".join(rng.choices(WORDS, k=rng.randint(4, 20))).capitalize() + "." for _ in range(sentences))
+
+
+def random_results(rng, count):
+    return [{
+        "filename": f"belge{i}.pdf",
+        "page": i,
+        "category_key": rng.choice(["kira", "is"]),
+        "content": random_page(rng, rng.randint(1, 30)),
+    } for i in range(count)]
+
+
+def packed_tokens(packed):
+    return sum(count_tokens(f"[KAYNAK: {r['filename']} S.{r['page']}]\n{r['content']}") for r in packed)
+
+
+@pytest.mark.parametrize("budget", [None, 50, 200, 800])
+def test_never_exceeds_the_budget(budget):
+    rng = random.Random(budget)
+    for _ in range(50):
+        results = random_results(rng, rng.randint(1, 8))
+        packed, stats = pack_context(results, token_budget=budget, chunk_max_tokens=rng.choice([40, 150, 350]))
+        limit = stats["baseline_tokens"] if budget is None else budget
+        assert stats["context_tokens"] <= limit
+        assert packed_tokens(packed) <= limit
+
+
+def test_default_budget_never_costs_more_than_the_old_slice():
+    rng = random.Random(1)
+    for _ in range(50):
+        results = random_results(rng, rng.randint(1, 8))
+        _, stats = pack_context(results)
+        assert stats["baseline_tokens"] == baseline_context_tokens(results)
+        assert stats["context_tokens"] <= stats["baseline_tokens"]
+        assert stats["tokens_saved"] >= 0
+
+
+def test_drops_near_duplicates():
+    rng = random.Random(2)
+    page = random_page(rng, 20)
+    other = random_page(rng, 20)
+    results = [
+        {"filename": "a.pdf", "page": 1, "category_key": "kira", "content": page},
+        {"filename": "a.pdf", "page": 2, "category_key": "kira", "content": page + " Ek."},
+        {"filename": "b.pdf", "page": 1, "category_key": "kira", "content": other},
+    ]
+    packed, stats = pack_context(results, token_budget=2000, chunk_max_tokens=1000)
+    assert stats["duplicates"] == 1
+    assert [(r["filename"], r["page"]) for r in packed] == [("a.pdf", 1), ("b.pdf", 1)]
+
+
+def test_truncates_at_sentence_then_word_boundaries():
+    text = "Birinci cümle kısa. İkinci cümle biraz daha uzun ve devam ediyor."
+    assert truncate_to_tokens(text, count_tokens("Birinci cümle kısa.") + 1) == "Birinci cümle kısa."
+    cut = truncate_to_tokens("noktasız " * 100, 10)
+    assert cut and not cut.endswith(" ") and set(cut.split()) == {"noktasız"}
+    assert truncate_to_tokens(text, 1000) == text
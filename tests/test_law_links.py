@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from law_links import IncrementalLawExtractor, LawRegistry, article_url, extract_law_links, get_default_registry
+
+
+def summary(links):
+    return [(link["key"], [a["number"] for a in link["articles"]]) for link in links]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("TBK Madde 299", [("tbk", ["299"])]),
+    ("Türk Borçlar Kanunu'nun 344. maddesi", [("tbk", ["344"])]),
+    ("6098 sayılı Kanun'un 17. maddesi", [("tbk", ["17"])]),
+    ("HMK md. 119", [("hmk", ["119"])]),
+    ("İş Kanunu m. 25", [("is_kanunu", ["25"])]),
+    ("İŞ KANUNU MADDE 17", [("is_kanunu", ["17"])]),
+    ("Medeni Kanunu (TMK) madde 5", [("medeni", ["5"])]),
+    ("Türk Ceza Kanunu uyarınca", [("tck", [])]),
+])
+def test_extracts_law_and_article(text, expected):
+    assert summary(extract_law_links(text)) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "hiçbir kanun yok",
+    "dosya no 60981",  # Rakamla biten takma ad başka rakamla devam edemez
+    "46098 sayılı",
+    "xtbk madde 3",  # Takma ad kelime başında olmalı
+])
+def test_ignores_non_references(text):
+    assert extract_law_links(text) == []
+
+
+def test_deduplicates_laws_and_articles_in_order():
+    text = "TBK 299. madde, TBK madde 299, HMK md. 119 ve TBK md. 344"
+    assert summary(extract_law_links(text)) == [("tbk", ["299", "344"]), ("hmk", ["119"])]
+
+
+def test_article_links_point_into_the_law_page():
+    law = get_default_registry().laws["tbk"]
+    [link] = extract_law_links("TBK madde 299")
+    assert link["url"] == law["url"]
+    assert link["articles"][0]["url"] == article_url(law, "299") == f"{law['url']}#:~:text=MADDE%20299%2D"
+
+
+def test_custom_registry_and_longest_alias():
+    registry = LawRegistry([{
+        "key": "kvkk",
+        "number": "6698",
+        "name": "Kişisel Verilerin Korunması Kanunu",
+        "aliases": ["kvkk", "kişisel verilerin korunması kanunu", "6698"],
+        "url": "https://example.test/kvkk",
+        "pdf": "https://example.test/kvkk.pdf",
+    }])
+    assert summary(registry.extract("KVKK md. 11 ve TBK madde 1")) == [("kvkk", ["11"])]
+    assert summary(extract_law_links("KVKK md. 11", registry)) == [("kvkk", ["11"])]
+    assert registry.max_match_length >= len("kişisel verilerin korunması kanunu")
+
+
+REFERENCES = [
+    "TBK Madde 299", "Türk Borçlar Kanunu'nun 344. maddesi", "HMK md. 119", "İş Kanunu m. 25",
+    "4857 sayılı Kanun'un 17. maddesi", "Medeni Kanun (TMK) madde 5", "TCK", "6100",
+]
+FILLER = ["kiracı", "bu", "hükme", "göre,", "dava", "açılabilir.", "\n", "**", "süre", "içinde", "1.", "-"]
+
+
+def random_answer(rng, words=80):
+    parts = [rng.choice(REFERENCES) if rng.random() < 0.15 else rng.choice(FILLER) for _ in range(words)]
+    return " ".join(parts)
+
+
+def random_chunks(rng, text):
+    chunks, i = [], 0
+    while i < len(text):
+        size = rng.choice([1, 2, 3, 5, 8, 40, 400])
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+
+def test_incremental_matches_batch_extraction():
+    rng = random.Random(7)
+    for _ in range(300):
+        text = random_answer(rng, words=rng.randint(0, 200))
+        extractor = IncrementalLawExtractor()
+        for chunk in random_chunks(rng, text):
+            extractor.feed(chunk)
+        extractor.finish()
+        assert extractor.links == extract_law_links(text), text
+
+
+def test_reference_split_across_chunks():
+    extractor = IncrementalLawExtractor()
+    text = "Bu konuda TBK Mad" + "de 299 uygulanır. " + "x " * 400
+    assert extractor.feed(text[:17]) is False
+    extractor.feed(text[17:])
+    extractor.finish()
+    assert summary(extractor.links) == [("tbk", ["299"])]
+
+
+def test_feed_and_finish_report_only_new_links():
+    extractor = IncrementalLawExtractor()
+    filler = "a " * extractor.carry * 2
+    assert extractor.feed("TBK madde 299 " + filler) is True
+    assert extractor.feed("TBK madde 299 " + filler) is False
+    assert extractor.feed("HMK md. 119") is False  # Henüz kuyrukta
+    assert extractor.finish() is True
+    assert extractor.finish() is False
+    assert summary(extractor.links) == [("tbk", ["299"]), ("hmk", ["119"])]
+
+
+def test_finish_without_links():
+    extractor = IncrementalLawExtractor()
+    extractor.feed("kanun atıfı olmayan kısa cevap")
+    assert extractor.finish() is False
+    assert extractor.links == []
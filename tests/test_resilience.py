@@ -0,0 +1,177 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitBreakerBoard, run_with_deadlines
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_after=10, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow() and not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.allow()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert not breaker.is_open
+
+
+def test_half_open_allows_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_after=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 9.9
+    assert not breaker.allow()
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # Deneme sürerken ikinci çağrı yok
+
+
+def test_successful_probe_closes_the_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_after=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open and breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_for_a_full_period():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_after=10, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_failure()  # Eşik beklenmeden tekrar açılır
+    clock.now = 19
+    assert not breaker.allow()
+    clock.now = 20
+    assert breaker.allow()
+
+
+def test_board_shares_breakers_by_name():
+    board = CircuitBreakerBoard(failure_threshold=1)
+    assert board.get("a") is board.get("a")
+    assert board.get("a") is not board.get("b")
+    assert board.get("a").failure_threshold == 1
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        yield pool
+
+
+def test_collects_results_and_failures(executor):
+    release = threading.Event()
+
+    def boom():
+        raise ValueError("bozuk")
+
+    def slow():
+        release.wait(5)
+        return "geç"
+
+    results, failures = run_with_deadlines(
+        executor,
+        {"ok": lambda: 1, "error": boom, "slow": slow},
+        {"ok": 1.0, "error": 1.0, "slow": 0.05},
+    )
+    release.set()
+    assert results == {"ok": 1}
+    assert failures == {"error": "ValueError", "slow": "timeout"}
+
+
+def test_timeout_does_not_wait_for_the_slow_call(executor):
+    release = threading.Event()
+    started = time.monotonic()
+    results, failures = run_with_deadlines(executor, {"slow": lambda: release.wait(5)}, {"slow": 0.05})
+    release.set()
+    assert failures == {"slow": "timeout"}
+    assert time.monotonic() - started < 1.0
+
+
+def test_hedged_request_wins_when_first_is_slow(executor):
+    release = threading.Event()
+    attempts = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            attempts.append(None)
+            attempt = len(attempts)
+        if attempt == 1:
+            release.wait(5)
+            return "ilk"
+        return "yedek"
+
+    results, failures = run_with_deadlines(executor, {"a": call}, {"a": 2.0}, hedge_after=0.05)
+    release.set()
+    assert results == {"a": "yedek"} and failures == {}
+    assert len(attempts) == 2
+
+
+def test_hedged_call_survives_a_failed_first_attempt(executor):
+    attempts = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            attempts.append(None)
+            attempt = len(attempts)
+        if attempt == 1:
+            time.sleep(0.1)
+            raise ConnectionError
+        time.sleep(0.2)
+        return "yedek"
+
+    results, failures = run_with_deadlines(executor, {"a": call}, {"a": 2.0}, hedge_after=0.05)
+    assert results == {"a": "yedek"} and failures == {}
+
+
+def test_hedged_call_fails_when_every_attempt_fails(executor):
+    def call():
+        time.sleep(0.1)
+        raise ConnectionError
+
+    results, failures = run_with_deadlines(executor, {"a": call}, {"a": 2.0}, hedge_after=0.05)
+    assert results == {} and failures == {"a": "ConnectionError"}
+
+
+def test_breakers_skip_open_circuits_and_record_outcomes(executor):
+    closed = CircuitBreaker(failure_threshold=1, reset_after=60)
+    opened = CircuitBreaker(failure_threshold=1, reset_after=60)
+    opened.record_failure()
+    calls = []
+
+    def failing():
+        raise TimeoutError
+
+    results, failures = run_with_deadlines(
+        executor,
+        {"up": failing, "down": lambda: calls.append("down")},
+        {"up": 1.0, "down": 1.0},
+        breakers={"up": closed, "down": opened},
+    )
+    assert results == {}
+    assert failures == {"up": "TimeoutError", "down": "circuit_open"}
+    assert calls == []
+    assert closed.is_open
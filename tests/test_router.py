@@ -0,0 +1,65 @@
+import random
+
+from router import AhoCorasick, KeywordRouter
+
+
+def naive_matches(patterns, text):
+    return sorted(
+        (start, value)
+        for pattern, value in patterns
+        for start in range(len(text) - len(pattern) + 1)
+        if text.startswith(pattern, start)
+    )
+
+
+def test_aho_corasick_finds_overlapping_matches():
+    patterns = [("he", "he"), ("she", "she"), ("his", "his"), ("hers", "hers")]
+    matches = sorted(AhoCorasick(patterns).iter_matches("ushers"))
+    assert matches == [(1, "she"), (2, "he"), (2, "hers")]
+
+
+def test_aho_corasick_matches_naive_search():
+    rng = random.Random(0)
+    for _ in range(200):
+        patterns = [("".join(rng.choices("abc", k=rng.randint(1, 4))), i) for i in range(rng.randint(1, 8))]
+        text = "".join(rng.choices("abc", k=rng.randint(0, 40)))
+        assert sorted(AhoCorasick(patterns).iter_matches(text)) == naive_matches(patterns, text)
+
+
+def test_aho_corasick_without_patterns():
+    assert list(AhoCorasick([]).iter_matches("metin")) == []
+
+
+COLLECTION_MAP = {
+    "kira": {"keywords": ["kira", "kiracı", "kira sözleşmesi", "kitap"]},
+    "is": {"keywords": ["işçi", "işveren", "tazminat"]},
+}
+
+
+def test_keywords_match_at_word_start_with_suffixes():
+    router = KeywordRouter(COLLECTION_MAP)
+    assert router.scores("Kiracının hakları") == {"kira": 2}
+    assert router.scores("akira nedir") == {}
+
+
+def test_multi_word_keywords_weigh_more():
+    router = KeywordRouter(COLLECTION_MAP)
+    # "kira" (1) + "kira sözleşmesi" (2)
+    assert router.scores("kira sözleşmesi feshi") == {"kira": 3}
+
+
+def test_ascii_folding_and_consonant_softening():
+    router = KeywordRouter(COLLECTION_MAP)
+    assert router.scores("isci haklari") == {"is": 1}
+    assert router.scores("İŞVEREN") == {"is": 1}
+    assert router.scores("kitabı iade") == {"kira": 1}
+
+
+def test_classify_and_top_categories():
+    router = KeywordRouter(COLLECTION_MAP)
+    assert router.classify("hava durumu") is None
+    assert router.top_categories("hava durumu") == []
+    assert router.classify("işçi tazminatı ve kira") == "is"
+    assert router.top_categories("işçi tazminatı ve kira", tie_ratio=0.75) == ["is"]
+    assert set(router.top_categories("işçi ve kira", tie_ratio=0.75)) == {"kira", "is"}
+    assert router.top_categories("işçi ve kira", k=1) in (["kira"], ["is"])
@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import Flight, SingleFlight
+
+
+def test_followers_join_the_running_flight_and_see_every_delta():
+    flights = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def producer(flight):
+        runs.append(None)
+        flight.set_result({"docs": 3})
+        flight.emit("Mer")
+        release.wait(5)  # Takipçiler akış ortasında katılır
+        flight.emit("haba")
+
+    leader, is_leader = flights.do("soru", producer)
+    assert leader.result() == {"docs": 3}
+    followers = [flights.do("soru", producer) for _ in range(3)]
+    release.set()
+
+    assert is_leader
+    assert all(flight is leader and not leading for flight, leading in followers)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        streams = list(pool.map(lambda flight: "".join(flight.stream()), [leader] + [f for f, _ in followers]))
+    assert streams == ["Merhaba"] * 4
+    assert len(runs) == 1
+    assert leader.subscribers == 4
+    assert flights.stats == {"flights": 1, "joined": 3}
+
+
+def test_key_is_released_after_the_flight_ends():
+    flights = SingleFlight()
+    first, _ = flights.do("soru", lambda flight: flight.set_result(1))
+    list(first.stream())
+    second, is_leader = flights.do("soru", lambda flight: flight.set_result(2))
+    assert is_leader and second is not first
+    assert second.result() == 2
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+    a, a_leader = flights.do("a", lambda flight: flight.set_result("a"))
+    b, b_leader = flights.do("b", lambda flight: flight.set_result("b"))
+    assert a_leader and b_leader
+    assert (a.result(), b.result()) == ("a", "b")
+
+
+def test_producer_error_reaches_result_and_stream_of_every_subscriber():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def producer(flight):
+        release.wait(5)
+        raise ConnectionError("arama yok")
+
+    leader, _ = flights.do("soru", producer)
+    follower, _ = flights.do("soru", producer)
+    release.set()
+    for flight in (leader, follower):
+        with pytest.raises(ConnectionError):
+            flight.result()
+        with pytest.raises(ConnectionError):
+            list(flight.stream())
+
+
+def test_error_after_result_keeps_result_and_fails_the_stream():
+    flights = SingleFlight()
+
+    def producer(flight):
+        flight.set_result("sonuçlar")
+        flight.emit("yarım")
+        raise TimeoutError
+
+    flight, _ = flights.do("soru", producer)
+    assert flight.result() == "sonuçlar"
+    received = []
+    with pytest.raises(TimeoutError):
+        for delta in flight.stream():
+            received.append(delta)
+    assert received == ["yarım"]
+
+
+def test_flight_stream_replays_from_the_start():
+    flight = Flight()
+    flight.emit("a")
+    flight.emit("b")
+    stream = flight.stream()
+    assert next(stream) == "a"
+    flight.emit("c")
+    flight.close()
+    assert list(stream) == ["b", "c"]
+    assert list(flight.stream()) == ["a", "b", "c"]
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from tiering import DRAFT_RESET, TierPolicy, estimate_cost, speculative_deltas
+
+
+def deltas(items, delay=0.0, error=None, started=None, closed=None):
+    """Parçaları aralıklarla üreten, isteğe bağlı olarak hata veren akış"""
+    try:
+        if started is not None:
+            started.wait(5)
+        for item in items:
+            if delay:
+                time.sleep(delay)
+            yield item
+        if error is not None:
+            raise error
+    finally:
+        if closed is not None:
+            closed.set()
+
+
+def test_final_replaces_draft_once_it_starts():
+    final_started = threading.Event()
+    draft = deltas(["t1", "t2", "t3"] * 50, delay=0.01)
+    final = deltas(["A", "B"], started=final_started)
+    stream = speculative_deltas(draft, final)
+    assert next(stream) == "t1"
+    final_started.set()
+    out = list(stream)
+    assert DRAFT_RESET in out
+    assert out[out.index(DRAFT_RESET) + 1:] == ["A", "B"]
+
+
+def test_draft_failure_falls_back_to_final():
+    final_started = threading.Event()
+    draft = deltas(["taslak"], error=RuntimeError("429"))
+    final = deltas(["A", "B"], started=final_started)
+    stream = speculative_deltas(draft, final)
+    assert next(stream) == "taslak"
+    final_started.set()
+    assert list(stream) == [DRAFT_RESET, "A", "B"]
+
+
+def test_draft_failing_before_any_delta_streams_only_final():
+    draft = deltas([], error=RuntimeError("429"))
+    assert list(speculative_deltas(draft, deltas(["A", "B"], delay=0.01))) == ["A", "B"]
+
+
+def test_final_failure_keeps_the_draft():
+    draft = deltas(["t1", "t2", "t3"], delay=0.05)
+    final = deltas([], error=ConnectionError("gpt-4o"))
+    assert list(speculative_deltas(draft, final)) == ["t1", "t2", "t3"]
+
+
+def test_empty_final_keeps_the_draft():
+    draft = deltas(["t1", "t2"], delay=0.05)
+    assert list(speculative_deltas(draft, deltas([]))) == ["t1", "t2"]
+
+
+def test_final_failure_without_draft_is_raised():
+    draft = deltas([], error=RuntimeError("429"))
+    final = deltas([], error=ConnectionError("gpt-4o"))
+    with pytest.raises(ConnectionError):
+        list(speculative_deltas(draft, final))
+
+
+def test_abandoned_stream_closes_draft_and_final():
+    draft_closed, final_closed = threading.Event(), threading.Event()
+    draft = deltas(["t"] * 1000, delay=0.01, closed=draft_closed)
+    final = deltas(["A"] * 1000, delay=0.05, closed=final_closed)
+    stream = speculative_deltas(draft, final)
+    next(stream)
+    stream.close()
+    assert draft_closed.is_set()
+    assert final_closed.wait(6)
+
+
+def test_policy_sends_only_confident_questions_to_the_fast_model():
+    policy = TierPolicy("mini", "big", speculative=True)
+    confident = {"embedding_routed": False, "ranked_categories": ["is"]}
+    decision = policy.decide("kıdem tazminatı nasıl hesaplanır", confident, {"is": 3})
+    assert (decision["model"], decision["reason"], decision["speculative"]) == ("mini", "confident", False)
+
+    assert policy.decide("soru", confident, {"is": 3, "kira": 2})["reason"] == "multi_category"
+    assert policy.decide("soru", confident, {"is": 1})["reason"] == "low_keyword_score"
+    assert policy.decide("soru", confident, {})["reason"] == "no_keyword_match"
+    routed = policy.decide("soru", {"embedding_routed": True, "ranked_categories": ["is"]}, {"is": 3})
+    assert (routed["model"], routed["speculative"]) == ("big", True)
+    assert policy.decide("kelime " * 20, confident, {"is": 3})["reason"] == "long_query"
+
+
+def test_estimate_cost():
+    assert estimate_cost("gpt-4o", 1_000_000, 0, 0) == pytest.approx(2.50)
+    assert estimate_cost("gpt-4o-mini", 1_000_000, 1_000_000, 1_000_000) == pytest.approx(0.075 + 0.60)
+    assert estimate_cost("bilinmeyen", 10, 0, 10) == 0.0
@@ -0,0 +1,27 @@
+"""Türkçe metin normalizasyonu yardımcıları"""
+import re
+
+# str.lower() "İ" harfini "i̇" (noktalı birleşik karakter) yapar, "I" harfini de "i" yapar.
+# Türkçe'de doğrusu İ→i ve I→ı olduğu için önce bu iki harfi elle çeviriyoruz.
+_TR_LOWER_MAP = str.maketrans({"İ": "i", "I": "ı"})
+
+# Türkçe klavye kullanmayan kullanıcılar için ("isci" → "işçi") ASCII katlama
+_TR_ASCII_MAP = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def turkish_lower(text):
+    """Türkçe'ye uygun küçük harf dönüşümü"""
+    return text.translate(_TR_LOWER_MAP).lower()
+
+
+def normalize_query(text):
+    """Soruyu karşılaştırma için normalize et (küçük harf, noktalama ve fazla boşluk yok)"""
+    text = _PUNCT_RE.sub(" ", turkish_lower(text))
+    return " ".join(text.split())
+
+
+def fold_turkish(text):
+    """Metni normalize edip Türkçe karakterlerden arındır (ç→c, ğ→g, ı→i, ö→o, ş→s, ü→u)"""
+    return normalize_query(text).translate(_TR_ASCII_MAP)
@@ -0,0 +1,179 @@
+"""Soruya göre model seçimi (hızlı / güçlü), spekülatif taslak ve maliyet kaydı"""
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Milyon token başına USD: (girdi, önbellekten girdi, çıktı)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+# Spekülatif modda taslak bitip asıl cevap başlarken akışa konan işaret:
+# dinleyen taraf o ana kadar gösterdiği taslağı silip baştan yazar
+DRAFT_RESET = object()
+
+
+def estimate_cost(model, prompt_tokens, cached_tokens, completion_tokens):
+    """API kullanım bilgisinden yaklaşık maliyet (fiyatı bilinmeyen model için 0)"""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+class TierPolicy:
+    """Keyword routing güveni yüksek, kısa ve tek kategorili soruları hızlı modele yollar.
+
+    Diğer her durum (eşleşme yok, birden fazla kategori, embedding ile
+    yönlendirilmiş, uzun soru) güçlü modele gider. Karar nedenleriyle
+    birlikte döner; eşikler kayıtlı telemetriye bakılarak ayarlanır.
+    """
+
+    def __init__(self, fast_model, strong_model, min_keyword_score=2, max_second_ratio=0.5,
+                 max_query_words=16, speculative=False):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.min_keyword_score = min_keyword_score
+        self.max_second_ratio = max_second_ratio
+        self.max_query_words = max_query_words
+        self.speculative = speculative
+
+    def decide(self, query, route, keyword_scores):
+        ranked = sorted(keyword_scores.values(), reverse=True)
+        best = ranked[0] if ranked else 0
+        second = ranked[1] if len(ranked) > 1 else 0
+        words = len(query.split())
+
+        if route["embedding_routed"]:
+            reason = "embedding_routed"
+        elif not best:
+            reason = "no_keyword_match"
+        elif len(route["ranked_categories"]) != 1 or second >= best * self.max_second_ratio:
+            reason = "multi_category"
+        elif best < self.min_keyword_score:
+            reason = "low_keyword_score"
+        elif words > self.max_query_words:
+            reason = "long_query"
+        else:
+            reason = "confident"
+
+        fast = reason == "confident"
+        return {
+            "tier": "fast" if fast else "strong",
+            "model": self.fast_model if fast else self.strong_model,
+            "reason": reason,
+            # Taslak sadece güçlü modele gidilen sorularda anlamlı
+            "speculative": self.speculative and not fast,
+            "keyword_score": best,
+            "second_score": second,
+            "query_words": words,
+        }
+
+
+def speculative_deltas(draft, final):
+    """Güçlü modelin ilk token'ı gelene kadar hızlı taslağı akıt, sonra DRAFT_RESET + asıl cevap.
+
+    final ayrı bir thread'de hemen başlatılır; taslak erken biterse asıl cevap
+    beklenir. Taslak hata verirse taslak yokmuş gibi asıl cevaba geçilir.
+    Asıl cevap hiç gelmezse (hata ya da boş cevap) o ana kadarki taslak kalır.
+    Taslak kesildiğinde draft.close() çağrılır; draft kendi API akışını
+    kapatmaktan sorumludur (bkz. Pipeline._model_deltas). final da hangi
+    yoldan çıkılırsa çıkılsın (dinleyen vazgeçse bile) kapatılır.
+    """
+    final_queue = queue.Queue()
+    done = object()
+    stop = threading.Event()
+
+    def pump():
+        try:
+            for delta in final:
+                if stop.is_set():
+                    break
+                final_queue.put(delta)
+        except Exception as e:
+            final_queue.put(e)
+        finally:
+            close = getattr(final, "close", None)
+            if close is not None:
+                close()
+            final_queue.put(done)
+
+    threading.Thread(target=pump, name="speculative-final", daemon=True).start()
+
+    def failed(item):
+        return item is done or isinstance(item, Exception)
+
+    first, failure, drafted = None, None, False
+    try:
+        while True:
+            try:
+                delta = next(draft)
+            except StopIteration:
+                break
+            except Exception:
+                # Taslağın hatası (ör. hızlı modelde 429) asıl cevabı etkilemez
+                logger.warning("Spekülatif taslak yarıda kaldı", exc_info=True)
+                break
+            # Asıl cevap hata verdiyse ya da boş geldiyse taslak sonuna kadar akar
+            if failure is None and not final_queue.empty():
+                item = final_queue.get()
+                if not failed(item):
+                    first = item
+                    break
+                failure = item
+            yield delta
+            drafted = True
+        draft.close()
+
+        if first is None and failure is None:
+            item = final_queue.get()
+            if failed(item):
+                failure = item
+            else:
+                first = item
+        if failure is not None:
+            if not drafted and isinstance(failure, Exception):
+                raise failure
+            return
+
+        if drafted:
+            yield DRAFT_RESET
+        yield first
+        while (item := final_queue.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        draft.close()
+
+
+class TierTelemetry:
+    """Her cevap için karar, gecikme, token ve maliyet kaydı (JSONL dosyasına ekler)"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.totals = {}
+
+    def record(self, decision, **measurements):
+        record = dict(decision, time=time.time(), **measurements)
+        with self._lock:
+            totals = self.totals.setdefault(decision["tier"], {"answers": 0, "cost_usd": 0.0, "seconds": 0.0})
+            totals["answers"] += 1
+            totals["cost_usd"] += measurements.get("cost_usd", 0.0)
+            totals["seconds"] += measurements.get("total_seconds", 0.0)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record